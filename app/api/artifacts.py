@@ -3,16 +3,21 @@ Artifact management API endpoints
 """
 
 import os
+import asyncio
 import mimetypes
 import logging
 from typing import Dict, Any
 from pathlib import Path
 
-from ..models import Artifact
+from ..models import Artifact, ExecutionStatus
 from ..core import PersistenceLayer, AuthManager
+from ..core.etags import make_etag, etag_matches
 
 logger = logging.getLogger(__name__)
 
+# Executions in these states no longer produce artifacts
+FINISHED_STATUSES = {ExecutionStatus.COMPLETED, ExecutionStatus.FAILED, ExecutionStatus.CANCELLED}
+
 
 class ArtifactsAPI:
     """API endpoints for artifact management"""
@@ -21,15 +26,28 @@ class ArtifactsAPI:
         self.persistence = persistence
         self.auth = auth
     
-    async def get_artifact(self, artifact_id: str, user=None) -> Dict[str, Any]:
-        """Get artifact metadata"""
+    async def get_artifact(self, artifact_id: str, if_none_match: str = None, user=None) -> Dict[str, Any]:
+        """Get artifact metadata, or status 304 when the client's ETag is current"""
         try:
             artifact = await self.persistence.get_artifact(artifact_id)
             if not artifact:
                 return {"error": "Artifact not found", "status": 404}
             
+            # Artifact rows are immutable once registered, but whether the file still
+            # exists and whether it has expired change over time, so both are part of the ETag
+            artifact_dict = artifact.to_dict()
+            etag = make_etag(
+                artifact.id, artifact.file_size, artifact.created_at.isoformat(),
+                artifact_dict['exists'], artifact_dict['is_expired']
+            )
+            cache_control = "private, max-age=60"
+            if etag_matches(etag, if_none_match):
+                return {"etag": etag, "cache_control": cache_control, "status": 304}
+            
             return {
-                "artifact": artifact.to_dict(),
+                "artifact": artifact_dict,
+                "etag": etag,
+                "cache_control": cache_control,
                 "status": 200
             }
             
@@ -60,15 +78,38 @@ class ArtifactsAPI:
             logger.error(f"Failed to download artifact {artifact_id}: {e}")
             return {"error": str(e), "status": 500}
     
-    async def get_execution_artifacts(self, execution_id: str, user=None) -> Dict[str, Any]:
-        """Get all artifacts for an execution"""
+    async def get_execution_artifacts(
+        self, execution_id: str, fields: str = None, if_none_match: str = None, user=None
+    ) -> Dict[str, Any]:
+        """Get all artifacts for an execution, optionally projected to comma-separated fields
+        
+        Returns status 304 when the client's ETag is current.
+        """
         try:
-            artifacts = await self.persistence.get_artifacts(execution_id)
+            execution, artifacts = await asyncio.gather(
+                self.persistence.get_execution(execution_id),
+                self.persistence.get_artifacts(execution_id)
+            )
+            field_set = set(fields.split(',')) if fields else None
+            
+            # The set only changes while the execution is running; file existence and
+            # expiry change over time, so they are part of the ETag when they are returned
+            artifact_dicts = [artifact.to_dict(field_set) for artifact in artifacts]
+            etag = make_etag(execution_id, fields or '', *(
+                f"{a.id}:{a.file_size}:{d.get('exists')}:{d.get('is_expired')}"
+                for a, d in zip(artifacts, artifact_dicts)
+            ))
+            finished = execution is not None and execution.status in FINISHED_STATUSES
+            cache_control = "private, max-age=60" if finished else "private, no-cache"
+            if etag_matches(etag, if_none_match):
+                return {"etag": etag, "cache_control": cache_control, "status": 304}
             
             return {
-                "artifacts": [artifact.to_dict() for artifact in artifacts],
+                "artifacts": artifact_dicts,
                 "execution_id": execution_id,
                 "count": len(artifacts),
+                "etag": etag,
+                "cache_control": cache_control,
                 "status": 200
             }
             
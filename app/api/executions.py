@@ -3,6 +3,9 @@ Execution management API endpoints
 """
 
 import json
+import asyncio
+import base64
+import binascii
 import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime
@@ -12,6 +15,54 @@ from ..core import ExecutionEngine, PersistenceLayer, AuthManager
 
 logger = logging.getLogger(__name__)
 
+# Status value -> enum, so filters are validated with a dict lookup instead of try/except
+_STATUS_VALUES = {status.value: status for status in ExecutionStatus}
+
+
+# Lists longer than this are serialized in a worker thread to keep the event loop responsive
+THREAD_SERIALIZE_THRESHOLD = 64
+
+
+async def _serialize_list(items: List[Any], serialize) -> List[Dict[str, Any]]:
+    """Serialize items, off the event loop when the list is large"""
+    if len(items) > THREAD_SERIALIZE_THRESHOLD:
+        return await asyncio.to_thread(lambda: [serialize(item) for item in items])
+    return [serialize(item) for item in items]
+
+
+def _log_entry_dict(entry) -> Dict[str, Any]:
+    """Serialize a (step, log) pair from the persistence layer"""
+    step, log = entry
+    log_dict = log.to_dict()
+    log_dict['step_id'] = step.id
+    log_dict['step_name'] = step.name
+    return log_dict
+
+
+def _parse_int(value, default: int) -> int:
+    """Parse an integer query parameter, passing through values that are already ints"""
+    if value is None:
+        return default
+    return value if isinstance(value, int) else int(value)
+
+
+def _encode_cursor(execution: Execution) -> str:
+    """Encode the keyset position of an execution as an opaque cursor"""
+    raw = f"{execution.created_at.isoformat()}|{execution.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(cursor: str) -> Optional[tuple]:
+    """Decode an opaque cursor into (created_at, id), or None if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        created_at, sep, execution_id = raw.partition('|')
+        if not sep or not execution_id:
+            return None
+        return datetime.fromisoformat(created_at), execution_id
+    except (binascii.Error, UnicodeError, ValueError):
+        return None
+
 
 class ExecutionsAPI:
     """API endpoints for execution management"""
@@ -61,35 +112,65 @@ class ExecutionsAPI:
     
     async def get_executions(self, query_params: Dict[str, Any], user=None) -> Dict[str, Any]:
         """Get list of executions with filtering"""
+        result = await self.get_execution_page(query_params, user)
+        if result["status"] != 200:
+            return result
+        
+        fields = result.pop("fields")
+        try:
+            result["executions"] = await _serialize_list(
+                result["executions"], lambda execution: execution.to_dict(fields)
+            )
+            return result
+        except Exception as e:
+            logger.error(f"Failed to get executions: {e}")
+            return {"error": str(e), "status": 500}
+    
+    async def get_execution_page(self, query_params: Dict[str, Any], user=None) -> Dict[str, Any]:
+        """Get a page of executions as models plus the requested fields, for callers that serialize rows themselves"""
         try:
             # Parse query parameters
-            limit = min(int(query_params.get('limit', 50)), 200)  # Max 200
-            offset = int(query_params.get('offset', 0))
+            limit = min(_parse_int(query_params.get('limit'), 50), 200)  # Max 200
+            offset = _parse_int(query_params.get('offset'), 0)
             status = query_params.get('status')
             user_filter = query_params.get('user')
+            cursor = query_params.get('cursor')
+            fields = set(query_params['fields'].split(',')) if query_params.get('fields') else None
             
             # Convert status string to enum
-            status_filter = None
-            if status:
-                try:
-                    status_filter = ExecutionStatus(status)
-                except ValueError:
-                    return {"error": f"Invalid status: {status}", "status": 400}
+            if status and status not in _STATUS_VALUES:
+                return {"error": f"Invalid status: {status}", "status": 400}
+            status_filter = _STATUS_VALUES.get(status) if status else None
+            
+            # Decode keyset cursor
+            cursor_key = None
+            if cursor:
+                cursor_key = _decode_cursor(cursor)
+                if not cursor_key:
+                    return {"error": f"Invalid cursor: {cursor}", "status": 400}
+            elif offset:
+                logger.warning("Offset pagination is deprecated, use the cursor returned as next_cursor")
             
             # Get executions
             executions = await self.persistence.get_executions(
                 limit=limit,
                 offset=offset,
                 status=status_filter,
-                user=user_filter
+                user=user_filter,
+                cursor=cursor_key
             )
             
+            # A full page means there may be more rows after the last one
+            next_cursor = _encode_cursor(executions[-1]) if executions and len(executions) == limit else None
+            
             return {
-                "executions": [exec.to_dict() for exec in executions],
+                "executions": executions,
                 "limit": limit,
                 "offset": offset,
                 "count": len(executions),
-                "status": 200
+                "next_cursor": next_cursor,
+                "status": 200,
+                "fields": fields
             }
             
         except Exception as e:
@@ -99,13 +180,11 @@ class ExecutionsAPI:
     async def get_execution(self, execution_id: str, user=None) -> Dict[str, Any]:
         """Get specific execution with steps and artifacts"""
         try:
-            execution = await self.persistence.get_execution(execution_id)
-            if not execution:
+            bundle = await self.persistence.get_execution_bundle(execution_id)
+            if not bundle:
                 return {"error": "Execution not found", "status": 404}
             
-            # Get steps and artifacts
-            steps = await self.persistence.get_steps(execution_id)
-            artifacts = await self.persistence.get_artifacts(execution_id)
+            execution, steps, artifacts = bundle
             
             return {
                 "execution": execution.to_dict(),
@@ -132,39 +211,48 @@ class ExecutionsAPI:
             logger.error(f"Failed to cancel execution {execution_id}: {e}")
             return {"error": str(e), "status": 500}
     
-    async def get_execution_logs(self, execution_id: str, step_id: str = None, user=None) -> Dict[str, Any]:
-        """Get execution logs, optionally filtered by step"""
+    async def get_execution_logs(
+        self, execution_id: str, step_id: str = None, limit: int = None, after: str = None, user=None
+    ) -> Dict[str, Any]:
+        """Get execution logs, optionally filtered by step, tailed after a timestamp and limited"""
         try:
+            after_ts = None
+            if after:
+                try:
+                    after_ts = datetime.fromisoformat(after)
+                except ValueError:
+                    return {"error": f"Invalid timestamp: {after}", "status": 400}
+            
+            # An empty limit means no limit, 0 means no entries
+            try:
+                limit = _parse_int(limit if limit != '' else None, None)
+            except ValueError:
+                return {"error": f"Invalid limit: {limit}", "status": 400}
+            if limit is not None and limit < 0:
+                return {"error": f"Invalid limit: {limit}", "status": 400}
+            
             if step_id:
-                # Get specific step logs
-                steps = await self.persistence.get_steps(execution_id)
-                target_step = next((s for s in steps if s.id == step_id), None)
-                
-                if not target_step:
+                # Get specific step logs, filtered in the query
+                steps = await self.persistence.get_steps(execution_id, step_id=step_id, include_logs=True)
+                if not steps:
                     return {"error": "Step not found", "status": 404}
                 
+                logs = steps[0].logs
+                if after_ts:
+                    logs = [log for log in logs if log.timestamp > after_ts]
+                
                 return {
-                    "logs": [log.to_dict() for log in target_step.logs],
+                    "logs": await _serialize_list(logs[:limit], lambda log: log.to_dict()),
                     "step_id": step_id,
                     "status": 200
                 }
             else:
-                # Get all execution logs
-                steps = await self.persistence.get_steps(execution_id)
-                all_logs = []
-                
-                for step in steps:
-                    for log in step.logs:
-                        log_dict = log.to_dict()
-                        log_dict['step_id'] = step.id
-                        log_dict['step_name'] = step.name
-                        all_logs.append(log_dict)
-                
-                # Sort by timestamp
-                all_logs.sort(key=lambda x: x['timestamp'])
-                
+                # Get all execution logs, already in timestamp order
+                entries = await self.persistence.get_execution_logs(
+                    execution_id, after=after_ts, limit=limit
+                )
                 return {
-                    "logs": all_logs,
+                    "logs": await _serialize_list(entries, _log_entry_dict),
                     "execution_id": execution_id,
                     "status": 200
                 }
@@ -176,10 +264,11 @@ class ExecutionsAPI:
     async def get_active_executions(self, user=None) -> Dict[str, Any]:
         """Get currently active executions"""
         try:
-            active_executions = self.execution_engine.get_active_executions()
+            # Shared snapshot, only re-serialized when active executions change
+            active_executions = self.execution_engine.get_active_snapshot()
             
             return {
-                "executions": [exec.to_dict() for exec in active_executions],
+                "executions": active_executions,
                 "count": len(active_executions),
                 "status": 200
             }
@@ -191,40 +280,18 @@ class ExecutionsAPI:
     async def get_execution_statistics(self, user=None) -> Dict[str, Any]:
         """Get execution statistics"""
         try:
-            # Get recent executions for statistics
-            recent_executions = await self.persistence.get_executions(limit=1000)
+            # Aggregation happens in the database, no rows are loaded
+            db_stats = await self.persistence.get_execution_stats()
+            total = db_stats["total_executions"]
             
             stats = {
-                "total_executions": len(recent_executions),
-                "status_breakdown": {},
-                "avg_duration": 0,
-                "success_rate": 0,
-                "active_count": len(self.execution_engine.get_active_executions())
+                "total_executions": total,
+                "status_breakdown": db_stats["status_breakdown"],
+                "avg_duration": db_stats["avg_duration"],
+                "success_rate": (db_stats["completed_executions"] / total) * 100 if total else 0,
+                "active_count": self.execution_engine.active_count
             }
             
-            # Calculate statistics
-            if recent_executions:
-                durations = []
-                success_count = 0
-                
-                for execution in recent_executions:
-                    # Status breakdown
-                    status = execution.status.value
-                    stats["status_breakdown"][status] = stats["status_breakdown"].get(status, 0) + 1
-                    
-                    # Duration and success rate (only for completed executions to avoid inflated values)
-                    if execution.duration_seconds and execution.status == ExecutionStatus.COMPLETED and execution.completed_at:
-                        durations.append(execution.duration_seconds)
-                    
-                    if execution.status == ExecutionStatus.COMPLETED:
-                        success_count += 1
-                
-                # Calculate averages
-                if durations:
-                    stats["avg_duration"] = sum(durations) / len(durations)
-                
-                stats["success_rate"] = (success_count / len(recent_executions)) * 100
-            
             return {"statistics": stats, "status": 200}
             
         except Exception as e:
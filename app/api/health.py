@@ -5,6 +5,7 @@ Health check and system status API endpoints
 import logging
 import psutil
 import asyncio
+import time
 from typing import Dict, Any
 from datetime import datetime
 
@@ -12,15 +13,42 @@ from ..core import PersistenceLayer, WebSocketServer, AuthManager
 
 logger = logging.getLogger(__name__)
 
+# Formatted timestamp as (unix second, isoformat), shared by all health responses
+_timestamp_cache = (0, "")
+
+
+def _timestamp() -> str:
+    """Current local time in ISO format, rebuilt at most once per second"""
+    global _timestamp_cache
+    now = int(time.time())
+    if _timestamp_cache[0] != now:
+        _timestamp_cache = (now, datetime.fromtimestamp(now).isoformat())
+    return _timestamp_cache[1]
+
 
 class HealthAPI:
     """API endpoints for health checks and system status"""
     
-    def __init__(self, persistence: PersistenceLayer, websocket_server: WebSocketServer, auth: AuthManager):
+    def __init__(self, persistence: PersistenceLayer, websocket_server: WebSocketServer, auth: AuthManager,
+                 stats_ttl: float = 10.0, stats_cache_min_total: int = 1000, sample_interval: float = 2.0):
         self.persistence = persistence
         self.websocket_server = websocket_server
         self.auth = auth
         self.start_time = datetime.now()
+        self._start_monotonic = time.monotonic()
+        
+        # Shared database probe: status counts as (monotonic timestamp, counts), reused for
+        # stats_ttl seconds by both the liveness check and the stats, plus the in-flight probe
+        self.stats_ttl = stats_ttl
+        # Below this many executions counting is cheap enough to run on every poll
+        self.stats_cache_min_total = stats_cache_min_total
+        self._probe_cache = (0.0, None)
+        self._probe_task = None
+        
+        # Latest (cpu_percent, virtual_memory, disk_usage), refreshed by a background sampler
+        self.sample_interval = sample_interval
+        self._system_sample = None
+        self._sampler_task = None
     
     async def health_check(self) -> Dict[str, Any]:
         """Basic health check"""
@@ -36,7 +64,7 @@ class HealthAPI:
             
             return {
                 "status": "healthy" if healthy else "unhealthy",
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": _timestamp(),
                 "components": {
                     "database": "healthy" if db_healthy else "unhealthy",
                     "websocket": "healthy" if ws_healthy else "unhealthy"
@@ -49,27 +77,24 @@ class HealthAPI:
             return {
                 "status": "unhealthy",
                 "error": str(e),
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": _timestamp(),
                 "http_status": 503
             }
     
     async def system_status(self) -> Dict[str, Any]:
         """Detailed system status"""
         try:
-            # System metrics
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
+            # System metrics and database stats, fetched concurrently
+            (cpu_percent, memory, disk), db_stats = await asyncio.gather(
+                self._get_system_sample(), self._get_database_stats()
+            )
             
             # Uptime
-            uptime = (datetime.now() - self.start_time).total_seconds()
+            uptime = time.monotonic() - self._start_monotonic
             
             # WebSocket info
             ws_clients = self.websocket_server.get_connected_clients_count()
             
-            # Database stats
-            db_stats = await self._get_database_stats()
-            
             return {
                 "system": {
                     "uptime_seconds": uptime,
@@ -86,7 +111,7 @@ class HealthAPI:
                     "auth_method": self.auth.method.value
                 },
                 "database": db_stats,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": _timestamp(),
                 "status": 200
             }
             
@@ -94,29 +119,78 @@ class HealthAPI:
             logger.error(f"Failed to get system status: {e}")
             return {"error": str(e), "status": 500}
     
+    async def _get_system_sample(self):
+        """Get the latest system metrics, starting the background sampler on first use"""
+        if self._sampler_task is None or self._sampler_task.done():
+            if self._system_sample is None:
+                await self._sample_system()
+            self._sampler_task = asyncio.create_task(self._run_sampler())
+        return self._system_sample
+    
+    async def _run_sampler(self):
+        """Refresh system metrics periodically"""
+        while True:
+            await asyncio.sleep(self.sample_interval)
+            try:
+                await self._sample_system()
+            except Exception as e:
+                logger.error(f"Failed to sample system metrics: {e}")
+    
+    async def _sample_system(self):
+        """Read system metrics in a worker thread"""
+        def read_metrics():
+            # Non-blocking: CPU usage since the previous call instead of sleeping for an interval
+            return psutil.cpu_percent(interval=None), psutil.virtual_memory(), psutil.disk_usage('/')
+        
+        self._system_sample = await asyncio.to_thread(read_metrics)
+    
+    async def stop(self):
+        """Stop the background system metrics sampler"""
+        if self._sampler_task:
+            self._sampler_task.cancel()
+            try:
+                await self._sampler_task
+            except asyncio.CancelledError:
+                pass
+            self._sampler_task = None
+    
     async def _check_database(self) -> bool:
         """Check database connectivity"""
         try:
-            # Try to get a single execution to test database
-            await self.persistence.get_executions(limit=1)
+            await self._probe_database()
             return True
         except Exception:
             return False
     
+    async def _probe_database(self) -> Dict[str, int]:
+        """Run the shared database probe, reusing a recent result or joining one in flight"""
+        probed_at, counts = self._probe_cache
+        if counts is not None and time.monotonic() - probed_at < self.stats_ttl:
+            return counts
+        
+        # Concurrent health and status polls all wait on a single query
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.ensure_future(self._run_probe())
+        return await asyncio.shield(self._probe_task)
+    
+    async def _run_probe(self) -> Dict[str, int]:
+        """Query status counts, which also proves the database is reachable"""
+        counts = await self.persistence.count_by_status()
+        if sum(counts.values()) >= self.stats_cache_min_total:
+            self._probe_cache = (time.monotonic(), counts)
+        return counts
+    
     async def _get_database_stats(self) -> Dict[str, Any]:
         """Get database statistics"""
         try:
-            # Get recent executions for counts
-            recent_executions = await self.persistence.get_executions(limit=1000)
+            counts = await self._probe_database()
             
-            stats = {
-                "total_executions": len(recent_executions),
-                "running_executions": len([e for e in recent_executions if e.status.value == "running"]),
-                "completed_executions": len([e for e in recent_executions if e.status.value == "completed"]),
-                "failed_executions": len([e for e in recent_executions if e.status.value == "failed"])
+            return {
+                "total_executions": sum(counts.values()),
+                "running_executions": counts.get("running", 0),
+                "completed_executions": counts.get("completed", 0),
+                "failed_executions": counts.get("failed", 0)
             }
-            
-            return stats
         except Exception as e:
             logger.error(f"Failed to get database stats: {e}")
             return {"error": str(e)}
@@ -124,23 +198,23 @@ class HealthAPI:
     async def performance_metrics(self) -> Dict[str, Any]:
         """Get detailed performance metrics"""
         try:
-            # Get database performance stats
-            db_stats = await self.persistence.get_performance_stats()
-            
-            # Get system performance
+            # Get database performance stats and system performance concurrently
+            db_stats, (cpu_percent, memory, disk) = await asyncio.gather(
+                self.persistence.get_performance_stats(), self._get_system_sample()
+            )
             system_stats = {
-                "cpu_percent": psutil.cpu_percent(interval=1),
-                "memory_percent": psutil.virtual_memory().percent,
-                "disk_usage_percent": psutil.disk_usage('/').percent,
+                "cpu_percent": cpu_percent,
+                "memory_percent": memory.percent,
+                "disk_usage_percent": disk.percent,
                 "open_connections": len(self.websocket_server.connected_clients) if self.websocket_server else 0
             }
             
             # Combine all metrics
             metrics = {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": _timestamp(),
                 "database": db_stats,
                 "system": system_stats,
-                "uptime_seconds": (datetime.now() - self.start_time).total_seconds()
+                "uptime_seconds": time.monotonic() - self._start_monotonic
             }
             
             return metrics
@@ -159,7 +233,7 @@ class HealthAPI:
             
             return {
                 "status": "optimization_completed",
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": _timestamp(),
                 "metrics": metrics
             }
         except Exception as e:
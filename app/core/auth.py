@@ -3,10 +3,13 @@ Authentication Manager (Currently Disabled)
 Prepared for future SSO integration
 """
 
+import hmac
 import logging
-from typing import Optional, Dict, Any
-from dataclasses import dataclass
-from enum import Enum
+import operator
+from functools import reduce
+from typing import Optional, Dict, Any, Tuple
+from dataclasses import dataclass, field
+from enum import Enum, IntFlag
 
 logger = logging.getLogger(__name__)
 
@@ -19,43 +22,65 @@ class AuthMethod(Enum):
     API_KEY = "api_key"
 
 
-class Role(Enum):
-    VIEWER = "viewer"
-    USER = "user"
-    ADMIN = "admin"
+class Role(IntFlag):
+    VIEWER = 1
+    USER = 2
+    ADMIN = 4
 
 
-@dataclass
+# Role masks for the permission checks
+_EXECUTE_MASK = Role.USER | Role.ADMIN
+_VIEW_MASK = Role.VIEWER | Role.USER | Role.ADMIN
+
+
+@dataclass(slots=True)
 class User:
     """User representation"""
     id: str
     username: str
     email: str = ""
     display_name: str = ""
-    roles: list = None
-    metadata: Dict[str, Any] = None
+    roles: Tuple[Role, ...] = (Role.USER,)
+    metadata: Optional[Dict[str, Any]] = None
+    _mask: int = field(default=0, init=False, repr=False, compare=False)
     
     def __post_init__(self):
-        if self.roles is None:
-            self.roles = [Role.USER]
         if self.metadata is None:
             self.metadata = {}
+        # Roles folded into a bitmask once, so permission checks are a single AND
+        self._mask = reduce(operator.or_, self.roles, 0)
     
     def has_role(self, role: Role) -> bool:
         """Check if user has specific role"""
-        return role in self.roles
+        return bool(self._mask & role)
     
     def is_admin(self) -> bool:
         """Check if user is admin"""
-        return Role.ADMIN in self.roles
+        return bool(self._mask & Role.ADMIN)
     
     def can_execute_scripts(self) -> bool:
         """Check if user can execute scripts"""
-        return Role.USER in self.roles or Role.ADMIN in self.roles
+        return bool(self._mask & _EXECUTE_MASK)
     
     def can_view_executions(self) -> bool:
         """Check if user can view executions"""
-        return any(role in self.roles for role in [Role.VIEWER, Role.USER, Role.ADMIN])
+        return bool(self._mask & _VIEW_MASK)
+
+
+# Users returned while authentication is disabled, built once instead of per request
+_ANON_HTTP_USER = User(
+    id="default",
+    username="anonymous",
+    email="anonymous@localhost",
+    display_name="Anonymous User",
+    roles=(Role.ADMIN,)  # Grant admin access when auth is disabled
+)
+_ANON_WS_USER = User(
+    id="ws_default",
+    username="anonymous_ws",
+    display_name="WebSocket User",
+    roles=(Role.ADMIN,)
+)
 
 
 class AuthManager:
@@ -66,6 +91,15 @@ class AuthManager:
         self.config = config or {}
         self.enabled = method != AuthMethod.DISABLED
         
+        # Configured API keys, encoded once for constant-time comparison
+        self._api_keys = frozenset(key.encode('utf-8') for key in self.config.get("api_keys", ()))
+        self._api_key_user = User(
+            id="api_key",
+            username="api_key",
+            display_name="API Key User",
+            roles=(Role.USER,)
+        )
+        
         if self.enabled:
             logger.info(f"Authentication enabled with method: {method.value}")
         else:
@@ -76,13 +110,7 @@ class AuthManager:
         
         if not self.enabled:
             # Authentication disabled - return default user
-            return User(
-                id="default",
-                username="anonymous",
-                email="anonymous@localhost",
-                display_name="Anonymous User",
-                roles=[Role.ADMIN]  # Grant admin access when auth is disabled
-            )
+            return _ANON_HTTP_USER
         
         # Authentication enabled - implement based on method
         if self.method == AuthMethod.BASIC:
@@ -100,12 +128,7 @@ class AuthManager:
         """Authenticate WebSocket connection"""
         
         if not self.enabled:
-            return User(
-                id="ws_default",
-                username="anonymous_ws",
-                display_name="WebSocket User",
-                roles=[Role.ADMIN]
-            )
+            return _ANON_WS_USER
         
         # Extract authentication from WebSocket headers
         # This could be a token in the headers or a cookie
@@ -132,15 +155,21 @@ class AuthManager:
     
     async def _authenticate_api_key(self, headers: Dict[str, str]) -> Optional[User]:
         """API key authentication implementation"""
-        # TODO: Implement API key validation
-        api_key = headers.get("x-api-key") or headers.get("authorization", "").replace("Bearer ", "")
-        
+        api_key = headers.get("x-api-key")
         if not api_key:
+            authorization = headers.get("authorization", "")
+            api_key = authorization[7:] if authorization.startswith("Bearer ") else None
+        
+        if not api_key or not self._api_keys:
             return None
         
-        # TODO: Validate API key against database/config
-        logger.warning("API key authentication not implemented")
-        return None
+        # Compare against every configured key so timing does not reveal a partial match
+        candidate = api_key.encode('utf-8')
+        matched = False
+        for key in self._api_keys:
+            matched |= hmac.compare_digest(candidate, key)
+        
+        return self._api_key_user if matched else None
     
     def get_auth_config(self) -> Dict[str, Any]:
         """Get authentication configuration for frontend"""
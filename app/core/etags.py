@@ -0,0 +1,20 @@
+"""
+ETag helpers shared by the HTTP server and the API endpoints
+"""
+
+import hashlib
+from typing import Optional
+
+
+def make_etag(*parts) -> str:
+    """Build a weak ETag from the values that identify a representation"""
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """Check an If-None-Match header value against an ETag"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates
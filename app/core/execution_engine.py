@@ -3,7 +3,7 @@ Execution Engine for running scripts and capturing output with marker parsing
 """
 
 import asyncio
-import subprocess
+import codecs
 import threading
 import logging
 import os
@@ -17,16 +17,50 @@ from .marker_parser import MarkerParser, MarkerType, ParsedMarker
 
 logger = logging.getLogger(__name__)
 
+# Bytes requested per read from the process output pipe
+READ_CHUNK_SIZE = 65536
+
+# Seconds between flushes of coalesced WebSocket updates
+NOTIFY_INTERVAL = 0.05
+
+# Seconds queued step saves wait so repeated changes are written once
+SAVE_INTERVAL = 0.2
+
 
 class ExecutionEngine:
     """Engine for executing scripts with real-time marker processing"""
     
-    def __init__(self, persistence_layer=None, websocket_server=None):
+    def __init__(self, persistence_layer=None, websocket_server=None, use_re2: bool = False):
         self.persistence = persistence_layer
         self.websocket_server = websocket_server
+        self.use_re2 = use_re2
         self.active_executions: Dict[str, Execution] = {}
         self.completed_executions: Dict[str, Execution] = {}  # Store completed executions
-        self.active_processes: Dict[str, subprocess.Popen] = {}
+        self.active_processes: Dict[str, asyncio.subprocess.Process] = {}
+        
+        # Serialized active executions as (execution, row) pairs, rebuilt only after the version changes
+        self.active_version = 0
+        self._active_snapshot = (-1, ())
+        
+        # Coalesced WebSocket updates, keyed by step/execution id and flushed every NOTIFY_INTERVAL
+        self._pending_step_updates: Dict[str, tuple] = {}
+        self._pending_execution_updates: Dict[str, Execution] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        
+        # Steps waiting to be persisted, keyed by step id and saved in batches
+        self._pending_saves: Dict[str, Step] = {}
+        self._save_task: Optional[asyncio.Task] = None
+        self._save_lock = asyncio.Lock()
+        
+        # Marker type -> handler, looked up once per output line
+        self._marker_handlers = {
+            MarkerType.STEP_START: self._handle_step_start,
+            MarkerType.STEP_COMPLETE: self._handle_step_complete,
+            MarkerType.STEP_ERROR: self._handle_step_error,
+            MarkerType.ARTIFACT: self._handle_artifact,
+            MarkerType.META: self._handle_metadata,
+            MarkerType.LOG: self._handle_log
+        }
         
     async def execute_script(
         self,
@@ -51,6 +85,7 @@ class ExecutionEngine:
         
         # Store execution
         self.active_executions[execution.id] = execution
+        self.active_version += 1
         if self.persistence:
             await self.persistence.save_execution(execution)
         
@@ -74,9 +109,11 @@ class ExecutionEngine:
                 del self.active_processes[execution.id]
             if execution.id in self.active_executions:
                 del self.active_executions[execution.id]
+                self.active_version += 1
             
             # Final save
             if self.persistence:
+                await self._save_pending_steps()
                 await self.persistence.save_execution(execution)
         
         return execution
@@ -98,57 +135,36 @@ class ExecutionEngine:
             env.update(environment)
         
         # Create marker parser
-        parser = MarkerParser()
+        parser = MarkerParser(use_re2=self.use_re2)
         current_step: Optional[Step] = None
         
         try:
-            # Start process
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=0,  # Unbuffered for real-time output
-                universal_newlines=True,
+            # Start process, its output is read through the event loop without threads
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
                 cwd=working_directory,
                 env=env,
-                preexec_fn=os.setsid if os.name == 'posix' else None
+                start_new_session=os.name == 'posix'
             )
             
             self.active_processes[execution.id] = process
             
             # Process output line by line
             async for line in self._read_process_output(process):
-                if not line.strip():
+                # Strip once, the parser works on the stripped line
+                line = line.strip()
+                if not line:
                     continue
                 
                 # Parse line for markers
-                parsed_marker = parser.parse_line(line)
-                
-                # Handle different marker types
-                if parsed_marker.marker_type == MarkerType.STEP_START:
-                    current_step = await self._handle_step_start(
-                        execution, parsed_marker, current_step
-                    )
-                
-                elif parsed_marker.marker_type == MarkerType.STEP_COMPLETE:
-                    current_step = await self._handle_step_complete(
-                        execution, parsed_marker, current_step
-                    )
+                parsed_marker = parser.parse_line_stripped(line)
                 
-                elif parsed_marker.marker_type == MarkerType.STEP_ERROR:
-                    current_step = await self._handle_step_error(
-                        execution, parsed_marker, current_step
-                    )
-                
-                elif parsed_marker.marker_type == MarkerType.ARTIFACT:
-                    await self._handle_artifact(execution, parsed_marker, current_step)
-                
-                elif parsed_marker.marker_type == MarkerType.META:
-                    await self._handle_metadata(execution, parsed_marker, current_step)
-                
-                elif parsed_marker.marker_type == MarkerType.LOG:
-                    await self._handle_log(execution, parsed_marker, current_step)
+                # Handle different marker types, each handler returns the new current step
+                handler = self._marker_handlers.get(parsed_marker.marker_type)
+                if handler:
+                    current_step = await handler(execution, parsed_marker, current_step)
                 
                 # Call progress callback
                 if progress_callback:
@@ -156,10 +172,7 @@ class ExecutionEngine:
             
             # Wait for process completion
             try:
-                exit_code = await asyncio.wait_for(
-                    self._wait_for_process(process),
-                    timeout=timeout
-                )
+                exit_code = await asyncio.wait_for(process.wait(), timeout=timeout)
             except asyncio.TimeoutError:
                 logger.warning(f"Execution {execution.id} timed out")
                 await self._terminate_process(process)
@@ -169,6 +182,7 @@ class ExecutionEngine:
             # Complete any remaining step
             if current_step and not current_step.is_finished:
                 current_step.complete(exit_code)
+                self._queue_step_save(current_step)
                 await self._notify_step_update(execution, current_step)
                 
                 # Check if step failed due to exit code and should stop execution
@@ -192,28 +206,38 @@ class ExecutionEngine:
                 process = self.active_processes[execution.id]
                 await self._terminate_process(process)
     
-    async def _read_process_output(self, process: subprocess.Popen):
+    async def _read_process_output(self, process: asyncio.subprocess.Process):
         """Async generator for reading process output line by line"""
-        loop = asyncio.get_event_loop()
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        tail = ""
         
         while True:
             try:
-                # Read line in thread to avoid blocking
-                line = await loop.run_in_executor(None, process.stdout.readline)
-                if not line:
+                # Read whatever is buffered, up to a chunk, without a thread hop
+                chunk = await process.stdout.read(READ_CHUNK_SIZE)
+                if not chunk:
                     # Process finished
                     break
-                yield line.rstrip('\n\r')
+                
+                # Decode the whole chunk at once, the decoder holds back a split multi-byte character
+                data = tail + decoder.decode(chunk)
+                
+                # Split on universal newlines, keeping a trailing partial line for the next chunk
+                if '\r' in data:
+                    data = data.replace('\r\n', '\n').replace('\r', '\n')
+                lines = data.split('\n')
+                tail = lines.pop()
+                for line in lines:
+                    yield line
             except Exception as e:
                 logger.error(f"Error reading process output: {e}")
                 break
+        
+        tail += decoder.decode(b"", final=True)
+        if tail:
+            yield tail
     
-    async def _wait_for_process(self, process: subprocess.Popen) -> int:
-        """Wait for process completion asynchronously"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, process.wait)
-    
-    async def _terminate_process(self, process: subprocess.Popen):
+    async def _terminate_process(self, process: asyncio.subprocess.Process):
         """Terminate process gracefully"""
         try:
             if os.name == 'posix':
@@ -221,14 +245,14 @@ class ExecutionEngine:
                 os.killpg(os.getpgid(process.pid), signal.SIGTERM)
                 # Wait a bit for graceful shutdown
                 await asyncio.sleep(2)
-                if process.poll() is None:
+                if process.returncode is None:
                     # Force kill if still running
                     os.killpg(os.getpgid(process.pid), signal.SIGKILL)
             else:
                 # Windows
                 process.terminate()
                 await asyncio.sleep(2)
-                if process.poll() is None:
+                if process.returncode is None:
                     process.kill()
         except Exception as e:
             logger.error(f"Error terminating process: {e}")
@@ -264,8 +288,7 @@ class ExecutionEngine:
         execution.current_step_index = step.index
         
         # Save and notify
-        if self.persistence:
-            await self.persistence.save_step(step)
+        self._queue_step_save(step)
         await self._notify_step_update(execution, step)
         await self._notify_execution_update(execution)
         
@@ -282,8 +305,8 @@ class ExecutionEngine:
             execution.completed_steps += 1
             
             # Save and notify
-            if self.persistence:
-                await self.persistence.save_step(current_step)
+            self._queue_step_save(current_step)
+            await self._save_pending_steps()
             await self._notify_step_update(execution, current_step)
             await self._notify_execution_update(execution)
             
@@ -302,8 +325,8 @@ class ExecutionEngine:
             current_step.fail(marker.content)
             
             # Save and notify
-            if self.persistence:
-                await self.persistence.save_step(current_step)
+            self._queue_step_save(current_step)
+            await self._save_pending_steps()
             await self._notify_step_update(execution, current_step)
             
             logger.error(f"Step failed: {current_step.name} - {marker.content}")
@@ -328,13 +351,13 @@ class ExecutionEngine:
     
     async def _handle_artifact(
         self, execution: Execution, marker: ParsedMarker, current_step: Optional[Step]
-    ):
+    ) -> Optional[Step]:
         """Handle ARTIFACT marker"""
         
         artifact_info = marker.artifact_info
         if not artifact_info:
             logger.warning(f"Invalid artifact marker: {marker.original_line}")
-            return
+            return current_step
         
         file_path, description = artifact_info
         
@@ -360,43 +383,98 @@ class ExecutionEngine:
         await self._notify_artifact_update(execution, artifact)
         
         logger.info(f"Registered artifact: {artifact.name}")
+        return current_step
     
     async def _handle_metadata(
         self, execution: Execution, marker: ParsedMarker, current_step: Optional[Step]
-    ):
+    ) -> Optional[Step]:
         """Handle META marker"""
         
         meta_info = marker.meta_key_value
         if not meta_info:
             logger.warning(f"Invalid meta marker: {marker.original_line}")
-            return
+            return current_step
         
         key, value = meta_info
         
         if current_step:
             current_step.metadata[key] = value
-            if self.persistence:
-                await self.persistence.save_step(current_step)
-            await self._notify_step_update(execution, current_step)
+            self._queue_step_save(current_step)
+            self._defer_step_update(execution, current_step)
         else:
             execution.metadata[key] = value
-            await self._notify_execution_update(execution)
+            self._defer_execution_update(execution)
         
         logger.debug(f"Added metadata: {key}={value}")
+        return current_step
     
     async def _handle_log(
         self, execution: Execution, marker: ParsedMarker, current_step: Optional[Step]
-    ):
+    ) -> Optional[Step]:
         """Handle regular log line"""
         
         if current_step:
             current_step.add_log(marker.content)
             # Notify periodically (not every log line to avoid spam)
             if len(current_step.logs) % 10 == 0:  # Every 10 log lines
-                await self._notify_step_update(execution, current_step)
+                self._defer_step_update(execution, current_step)
+        return current_step
+    
+    def _queue_step_save(self, step: Step):
+        """Queue a step for the next batched save"""
+        if self.persistence:
+            self._pending_saves[step.id] = step
+            if self._save_task is None or self._save_task.done():
+                self._save_task = asyncio.create_task(self._save_pending_steps(SAVE_INTERVAL))
+    
+    async def _save_pending_steps(self, delay: float = 0):
+        """Save queued steps, after an optional delay that lets more changes batch up"""
+        if delay:
+            await asyncio.sleep(delay)
+        
+        # Serialized so a forced flush never overtakes an older in-flight save of the same step
+        async with self._save_lock:
+            pending, self._pending_saves = self._pending_saves, {}
+            if pending:
+                await self.persistence.save_steps(list(pending.values()))
+    
+    def _defer_step_update(self, execution: Execution, step: Step):
+        """Queue a step update for the next coalesced flush"""
+        if self.websocket_server:
+            self._pending_step_updates[step.id] = (execution, step)
+            self._schedule_flush()
+    
+    def _defer_execution_update(self, execution: Execution):
+        """Queue an execution update for the next coalesced flush"""
+        self.active_version += 1
+        if self.websocket_server:
+            self._pending_execution_updates[execution.id] = execution
+            self._schedule_flush()
+    
+    def _schedule_flush(self):
+        """Start the flush task unless one is already waiting"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_pending_updates())
+    
+    async def _flush_pending_updates(self):
+        """Broadcast queued updates once per interval, however many changes were queued"""
+        await asyncio.sleep(NOTIFY_INTERVAL)
+        step_updates, self._pending_step_updates = self._pending_step_updates, {}
+        execution_updates, self._pending_execution_updates = self._pending_execution_updates, {}
         
+        try:
+            for execution, step in step_updates.values():
+                await self.websocket_server.broadcast_step_update(execution, step)
+            for execution in execution_updates.values():
+                await self.websocket_server.broadcast_execution_update(execution)
+        except Exception as e:
+            logger.error(f"Failed to flush pending updates: {e}")
+    
     async def _notify_execution_update(self, execution: Execution):
         """Notify about execution updates"""
+        self.active_version += 1
+        self._pending_execution_updates.pop(execution.id, None)
+        
         # Move completed/failed executions to completed_executions
         if execution.status in [ExecutionStatus.COMPLETED, ExecutionStatus.FAILED, ExecutionStatus.CANCELLED]:
             if execution.id in self.active_executions:
@@ -405,6 +483,7 @@ class ExecutionEngine:
                 # Remove from active executions after a short delay to allow UI updates
                 await asyncio.sleep(1)  # Give time for WebSocket to propagate
                 del self.active_executions[execution.id]
+                self.active_version += 1
                 
                 # Clean up process references
                 if execution.id in self.active_processes:
@@ -417,6 +496,7 @@ class ExecutionEngine:
     
     async def _notify_step_update(self, execution: Execution, step: Step):
         """Notify about step updates"""
+        self._pending_step_updates.pop(step.id, None)
         if self.websocket_server:
             await self.websocket_server.broadcast_step_update(execution, step)
     
@@ -446,6 +526,24 @@ class ExecutionEngine:
         """Get list of currently active executions"""
         return list(self.active_executions.values())
     
+    @property
+    def active_count(self) -> int:
+        """Number of currently active executions, without copying them into a list"""
+        return len(self.active_executions)
+    
+    def get_active_snapshot(self) -> List[Dict[str, Any]]:
+        """Get serialized active executions
+        
+        Rows are rebuilt only after active_version changes. Each call gets its own
+        copies, with duration_seconds recomputed since it grows with the clock
+        while an execution runs.
+        """
+        version, snapshot = self._active_snapshot
+        if version != self.active_version:
+            snapshot = tuple((execution, execution.to_dict()) for execution in self.active_executions.values())
+            self._active_snapshot = (self.active_version, snapshot)
+        return [{**row, 'duration_seconds': execution.duration_seconds} for execution, row in snapshot]
+    
     def is_execution_active(self, execution_id: str) -> bool:
         """Check if execution is currently active"""
         return execution_id in self.active_executions
\ No newline at end of file
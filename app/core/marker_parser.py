@@ -2,14 +2,49 @@
 Marker Parser Engine for processing standardized markers in script output
 """
 
+import math
 import re
+import sys
+from functools import lru_cache
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional, Dict, Any, List, Tuple
 import logging
 
+try:
+    # Optional linear-time (DFA) regex engine for the marker pattern: pip install google-re2
+    import re2
+except ImportError:
+    re2 = None
+
 logger = logging.getLogger(__name__)
 
+# Substrings every marker contains, checked before running the marker regex
+_MARKER_KEYWORDS = ('STEP_', 'ARTIFACT:', 'META:')
+
+# Parameter patterns like [param=value] or {param:value}, compiled once at import
+_PARAM_PATTERNS = (
+    re.compile(r'\[(\w+)=([^\]]+)\]'),  # [duration=60]
+    re.compile(r'\{(\w+):([^}]+)\}'),   # {timeout:30}
+    re.compile(r'--(\w+)=(\S+)'),       # --timeout=30
+)
+
+# First marker prefix in a line, for syntax validation
+_VALIDATE_RE = re.compile(r'(STEP_START|STEP_COMPLETE|STEP_ERROR|ARTIFACT|META):', re.IGNORECASE)
+
+# Marker keyword -> priority when a line holds several markers, lowest wins
+_MARKER_PRIORITY = {'STEP_START': 0, 'STEP_COMPLETE': 1, 'STEP_ERROR': 2, 'ARTIFACT': 3, 'META': 4}
+
+# Boolean parameter literals
+_BOOLS = {'true': True, 'false': False}
+
+# Plain decimal numbers; int()/float() alone would also accept "1_000", " 7 " or non-ASCII digits
+_INT_RE = re.compile(r'-?[0-9]+')
+_FLOAT_RE = re.compile(r'-?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?')
+
+# Shared parameters of markers without any, never mutated
+_EMPTY_DICT: Dict[str, Any] = {}
+
 
 class MarkerType(Enum):
     STEP_START = "STEP_START"
@@ -21,6 +56,10 @@ class MarkerType(Enum):
     UNKNOWN = "UNKNOWN"
 
 
+# Marker types that carry a step name
+_STEP_TYPES = frozenset({MarkerType.STEP_START, MarkerType.STEP_COMPLETE, MarkerType.STEP_ERROR})
+
+
 @dataclass
 class ParsedMarker:
     """Represents a parsed marker from script output"""
@@ -29,11 +68,21 @@ class ParsedMarker:
     parameters: Dict[str, Any]
     original_line: str
     line_number: int = 0
+    # Artifact (file, description) or meta (key, value), split once at construction
+    _split: Optional[Tuple[str, str]] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        if self.marker_type == MarkerType.ARTIFACT:
+            parts = self.content.split(':', 1)
+            self._split = (parts[0], parts[1]) if len(parts) == 2 else (parts[0], "")
+        elif self.marker_type == MarkerType.META:
+            parts = self.content.split(':', 1)
+            self._split = (parts[0], parts[1]) if len(parts) == 2 else None
     
     @property
     def step_name(self) -> Optional[str]:
         """Get step name for step-related markers"""
-        if self.marker_type in [MarkerType.STEP_START, MarkerType.STEP_COMPLETE, MarkerType.STEP_ERROR]:
+        if self.marker_type in _STEP_TYPES:
             # Extract step name before any parameters
             # e.g., "environment_check[stop_on_error=true]" -> "environment_check"
             step_name = self.content
@@ -53,31 +102,89 @@ class ParsedMarker:
     def artifact_info(self) -> Optional[Tuple[str, str]]:
         """Get artifact file and description for artifact markers"""
         if self.marker_type == MarkerType.ARTIFACT:
-            parts = self.content.split(':', 1)
-            if len(parts) == 2:
-                return parts[0], parts[1]
-            return parts[0], ""
+            return self._split
         return None
     
     @property
     def meta_key_value(self) -> Optional[Tuple[str, str]]:
         """Get metadata key-value pair for meta markers"""
         if self.marker_type == MarkerType.META:
-            parts = self.content.split(':', 1)
-            if len(parts) == 2:
-                return parts[0], parts[1]
+            return self._split
         return None
 
 
+def _coerce_value(value: str) -> Any:
+    """Convert a parameter value to bool, int or float when it parses as one"""
+    lowered = value.lower()
+    if lowered in _BOOLS:
+        return _BOOLS[lowered]
+    if _INT_RE.fullmatch(value):
+        return int(value)
+    if not _FLOAT_RE.fullmatch(value):
+        return value
+    number = float(value)
+    # Keep values that overflow to inf as strings, they are not valid JSON numbers
+    return number if math.isfinite(number) else value
+
+
+@lru_cache(maxsize=4096)
+def _extract_parameters_cached(content: str) -> Tuple[Tuple[str, Any], ...]:
+    """Extract (key, value) parameter pairs from marker content, memoized since markers repeat"""
+    parameters = {}
+    
+    for pattern in _PARAM_PATTERNS:
+        for match in pattern.finditer(content):
+            key, value = match.groups()
+            # Try to convert to appropriate type
+            parameters[sys.intern(key)] = _coerce_value(value)
+    
+    return tuple(parameters.items())
+
+
 class MarkerParser:
     """Parser for standardized markers in script output"""
     
-    def __init__(self):
+    # Marker keyword -> type, for dispatching matches of the combined pattern
+    _TYPE_MAP = {
+        'STEP_START': MarkerType.STEP_START,
+        'STEP_COMPLETE': MarkerType.STEP_COMPLETE,
+        'STEP_ERROR': MarkerType.STEP_ERROR,
+        'ARTIFACT': MarkerType.ARTIFACT,
+        'META': MarkerType.META
+    }
+    
+    # Marker keyword -> (error when content is missing, error when content lacks a ':' separator)
+    _VALIDATION_ERRORS = {
+        'STEP_START': ("STEP_START marker requires a step name", None),
+        'STEP_COMPLETE': ("STEP_COMPLETE marker requires a step name", None),
+        'STEP_ERROR': ("STEP_ERROR marker requires an error description", None),
+        'ARTIFACT': (
+            "ARTIFACT marker requires a file path",
+            "ARTIFACT marker format should be 'ARTIFACT:file_path:description'"
+        ),
+        'META': ("META marker requires key:value pair", "META marker format should be 'META:key:value'")
+    }
+    
+    def __init__(self, use_re2: bool = False):
         self.line_number = 0
+        # re2 pays off on long output lines but its per-call overhead is higher on short ones
+        if use_re2 and re2 is None:
+            logger.warning("google-re2 is not installed, falling back to re for marker parsing")
+        self.use_re2 = use_re2 and re2 is not None
         self._compile_patterns()
         
     def _compile_patterns(self):
         """Compile regex patterns for marker detection"""
+        # All marker types in one pattern, so a line is scanned once. The inline (?i) flag and
+        # named groups behave the same in re and re2
+        engine = re2 if self.use_re2 else re
+        self._combined = engine.compile(
+            r'(?i)^(?:.*?)?(?P<type>STEP_START|STEP_COMPLETE|STEP_ERROR|ARTIFACT|META):(?P<content>.+?)(?:\s*$)'
+        )
+        # Bound once, parse_line calls it for every candidate line
+        self._search = self._combined.search
+        
+        # Per-type patterns, for matching a single marker type
         self.patterns = {
             MarkerType.STEP_START: re.compile(
                 r'^(?:.*?)?STEP_START:(.+?)(?:\s*$)',
@@ -103,59 +210,57 @@ class MarkerParser:
     
     def parse_line(self, line: str) -> ParsedMarker:
         """Parse a single line of output for markers"""
+        return self.parse_line_stripped(line.strip())
+    
+    def parse_line_stripped(self, line: str) -> ParsedMarker:
+        """Parse a line that has already been stripped of surrounding whitespace"""
         self.line_number += 1
-        line = line.strip()
         
-        # Try to match each marker type
-        for marker_type, pattern in self.patterns.items():
-            match = pattern.search(line)
-            if match:
-                content = match.group(1).strip()
-                return ParsedMarker(
-                    marker_type=marker_type,
-                    content=content,
-                    parameters=self._extract_parameters(content),
-                    original_line=line,
-                    line_number=self.line_number
-                )
+        # Match all marker types in a single search, skipping the regex for lines
+        # that cannot contain a marker (markers are case-insensitive, so compare uppercased)
+        match = None
+        if ':' in line:
+            upper = line.upper()
+            if any(keyword in upper for keyword in _MARKER_KEYWORDS):
+                match = self._search(line)
+        if match:
+            marker_type = self._TYPE_MAP[match.group('type').upper()]
+            content = match.group('content')
+            # The combined pattern finds the leftmost marker. When another marker follows it,
+            # the per-type patterns decide instead, in priority order
+            # (STEP_START > STEP_COMPLETE > STEP_ERROR > ARTIFACT > META)
+            if _VALIDATE_RE.search(content):
+                for marker_type, pattern in self.patterns.items():
+                    match = pattern.search(line)
+                    if match:
+                        content = match.group(1)
+                        break
+            # Marker payloads repeat (same step names, keys), share one copy of each
+            content = sys.intern(content.strip())
+            return ParsedMarker(
+                marker_type=marker_type,
+                content=content,
+                # Only STEP_START parameters are used, other markers share the empty dict
+                parameters=self._extract_parameters(content) if marker_type == MarkerType.STEP_START else _EMPTY_DICT,
+                original_line=line,
+                line_number=self.line_number
+            )
         
         # No marker found, treat as log
         return ParsedMarker(
             marker_type=MarkerType.LOG,
             content=line,
-            parameters={},
+            parameters=_EMPTY_DICT,
             original_line=line,
             line_number=self.line_number
         )
     
     def _extract_parameters(self, content: str) -> Dict[str, Any]:
         """Extract parameters from marker content"""
-        parameters = {}
-        
-        # Look for parameter patterns like [param=value] or {param:value}
-        param_patterns = [
-            re.compile(r'\[(\w+)=([^\]]+)\]'),  # [duration=60]
-            re.compile(r'\{(\w+):([^}]+)\}'),   # {timeout:30}
-            re.compile(r'--(\w+)=(\S+)'),       # --timeout=30
-        ]
-        
-        for pattern in param_patterns:
-            for match in pattern.finditer(content):
-                key, value = match.groups()
-                # Try to convert to appropriate type
-                try:
-                    if value.lower() in ['true', 'false']:
-                        parameters[key] = value.lower() == 'true'
-                    elif value.isdigit():
-                        parameters[key] = int(value)
-                    elif '.' in value and value.replace('.', '').isdigit():
-                        parameters[key] = float(value)
-                    else:
-                        parameters[key] = value
-                except ValueError:
-                    parameters[key] = value
-        
-        return parameters
+        # Most markers carry no parameters at all
+        if '[' not in content and '{' not in content and '--' not in content:
+            return _EMPTY_DICT
+        return dict(_extract_parameters_cached(content))
     
     def reset(self):
         """Reset parser state"""
@@ -165,44 +270,25 @@ class MarkerParser:
         """Validate marker syntax and return error message if invalid"""
         line = line.strip()
         
-        # Check for marker prefix
-        marker_prefixes = ['STEP_START:', 'STEP_COMPLETE:', 'STEP_ERROR:', 'ARTIFACT:', 'META:']
-        has_marker = any(prefix in line.upper() for prefix in marker_prefixes)
-        
-        if not has_marker:
+        # Find the marker prefix, if any, in one pass
+        match = _VALIDATE_RE.search(line)
+        if not match:
             return True, None  # No marker, valid
         
-        # Validate specific marker formats
-        if 'STEP_START:' in line.upper():
-            match = self.patterns[MarkerType.STEP_START].search(line)
-            if not match or not match.group(1).strip():
-                return False, "STEP_START marker requires a step name"
-        
-        elif 'STEP_COMPLETE:' in line.upper():
-            match = self.patterns[MarkerType.STEP_COMPLETE].search(line)
-            if not match or not match.group(1).strip():
-                return False, "STEP_COMPLETE marker requires a step name"
-        
-        elif 'STEP_ERROR:' in line.upper():
-            match = self.patterns[MarkerType.STEP_ERROR].search(line)
-            if not match or not match.group(1).strip():
-                return False, "STEP_ERROR marker requires an error description"
-        
-        elif 'ARTIFACT:' in line.upper():
-            match = self.patterns[MarkerType.ARTIFACT].search(line)
-            if not match or not match.group(1).strip():
-                return False, "ARTIFACT marker requires a file path"
-            content = match.group(1).strip()
-            if ':' not in content:
-                return False, "ARTIFACT marker format should be 'ARTIFACT:file_path:description'"
+        # With several markers, validate the highest-priority one where it first appears
+        if _VALIDATE_RE.search(line, match.end()):
+            match = min(
+                _VALIDATE_RE.finditer(line),
+                key=lambda candidate: (_MARKER_PRIORITY[candidate.group(1).upper()], candidate.start())
+            )
         
-        elif 'META:' in line.upper():
-            match = self.patterns[MarkerType.META].search(line)
-            if not match or not match.group(1).strip():
-                return False, "META marker requires key:value pair"
-            content = match.group(1).strip()
-            if ':' not in content:
-                return False, "META marker format should be 'META:key:value'"
+        # Validate specific marker formats
+        missing_error, format_error = self._VALIDATION_ERRORS[match.group(1).upper()]
+        content = line[match.end():].strip()
+        if not content:
+            return False, missing_error
+        if format_error and ':' not in content:
+            return False, format_error
         
         return True, None
     
@@ -3,29 +3,638 @@ Persistence Layer for storing executions, steps, and artifacts
 """
 
 import sqlite3
-import json
 import os
+import re
 import shutil
+import errno
+import struct
+import mmap
+import hashlib
+import time
 import asyncio
+import heapq
+import itertools
 import aiosqlite
+import orjson
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any, Tuple, Callable
 from datetime import datetime, timedelta
 import logging
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
 
 from ..models import Execution, Step, Artifact, ExecutionStatus, StepStatus, ArtifactType
+from ..models.step import LogEntry
+
+try:
+    # Optional compression of the step logs of finished executions: pip install zstandard
+    import zstandard
+except ImportError:
+    zstandard = None
 
 logger = logging.getLogger(__name__)
 
+# Linux ioctl that makes dst a copy-on-write clone of src (Btrfs, XFS, overlayfs on those)
+_FICLONE = 0x40049409
+
+# errnos meaning a kernel copy primitive is unavailable for this pair of files
+_KERNEL_COPY_UNSUPPORTED = (errno.EXDEV, errno.ENOSYS, errno.EOPNOTSUPP, errno.EINVAL)
+
+# Timestamps are stored as integer microseconds since the epoch, counted in the naive
+# local time the models use, both in step log frames and in the database columns
+_EPOCH = datetime(1970, 1, 1)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+# Step log files are a magic header followed by frames of (microseconds since the
+# epoch, content length) and the UTF-8 content, so loading needs no text parsing
+_LOG_MAGIC = b"SFLOG\x01\n"
+_LOG_FRAME = struct.Struct("<qI")
+
+# Step logs of finished executions are replaced by a zstd-compressed copy with this suffix;
+# files below the minimum size are left alone since there is little to gain
+_COMPRESSED_SUFFIX = ".zst"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+LOG_COMPRESS_MIN_SIZE = 4096
+
+# Step log files at least this large are memory-mapped instead of read into a buffer
+LOG_MMAP_MIN_SIZE = 1024 * 1024
+
+# Databases at least this large are analyzed on startup if they have no planner statistics yet
+ANALYZE_MIN_DB_SIZE = 16 * 1024 * 1024
+
+# Seconds between background WAL checkpoints, and the WAL size in frames after which
+# a fully checkpointed WAL file is truncated instead of left at its high-water mark
+WAL_CHECKPOINT_INTERVAL = 30.0
+WAL_TRUNCATE_FRAMES = 4096
+
+_TERMINAL_STATUSES = frozenset((ExecutionStatus.COMPLETED, ExecutionStatus.FAILED, ExecutionStatus.CANCELLED))
+
+# "[timestamp] content" lines of a legacy text step log file, matched over the whole text
+_LOG_LINE_RE = re.compile(r"^\s*\[([^\]\n]+)\] (.*?)[ \t\r]*$", re.MULTILINE)
+
+
+def _dumps(value: Any) -> str:
+    """Serialize a JSON column value with orjson, decoded since the columns are TEXT"""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+
+def _encode_log_entries(log_entries: List[LogEntry]) -> bytes:
+    """Encode log entries as length-prefixed frames"""
+    pack = _LOG_FRAME.pack
+    frames = []
+    for log_entry in log_entries:
+        content = log_entry.content.encode('utf-8')
+        frames.append(pack((log_entry.timestamp - _EPOCH) // _ONE_MICROSECOND, len(content)))
+        frames.append(content)
+    return b"".join(frames)
+
+
+def _decode_log_frames(data) -> List[LogEntry]:
+    """Decode the frames following the magic header, ignoring a truncated trailing frame"""
+    unpack = _LOG_FRAME.unpack_from
+    header_size = _LOG_FRAME.size
+    pos = len(_LOG_MAGIC)
+    logs = []
+    # Released on exit so an mmap passed in can be closed afterwards
+    with memoryview(data) as view:
+        end = len(view)
+        while pos + header_size <= end:
+            micros, length = unpack(view, pos)
+            pos += header_size
+            if pos + length > end:
+                break
+            logs.append(LogEntry(
+                timestamp=_EPOCH + timedelta(microseconds=micros),
+                content=str(view[pos:pos + length], 'utf-8', 'replace')
+            ))
+            pos += length
+    return logs
+
+
+def _decode_legacy_log_text(text: str) -> List[LogEntry]:
+    """Parse a step log file written in the old "[timestamp] content" text format"""
+    matches = _LOG_LINE_RE.findall(text)
+    fromisoformat = datetime.fromisoformat
+    try:
+        return [LogEntry(timestamp=fromisoformat(timestamp), content=content) for timestamp, content in matches]
+    except ValueError:
+        pass
+    
+    # Some timestamp is malformed: keep those lines whole, stamped with the load time
+    logs = []
+    for timestamp, content in matches:
+        try:
+            logs.append(LogEntry(timestamp=fromisoformat(timestamp), content=content))
+        except ValueError:
+            logs.append(LogEntry(content=f"[{timestamp}] {content}"))
+    return logs
+
+
+def _ensure_dir(path: Path, known_dirs: set):
+    """Create a directory unless it is already known to exist"""
+    if path not in known_dirs:
+        path.mkdir(exist_ok=True)
+        known_dirs.add(path)
+
+
+# os.open flags for each log write mode; O_APPEND makes every write land at the end of the file
+_LOG_OPEN_FLAGS = {
+    'ab': os.O_WRONLY | os.O_CREAT | os.O_APPEND,
+    'wb': os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+}
+
+
+def _write_log_files(writes: List[Tuple[Path, str, bytes]], known_dirs: set):
+    """Write or append encoded log frames, one (path, mode, data) per step
+    
+    Each file gets the already joined frames in a single unbuffered write,
+    without a buffered file object in between.
+    """
+    for log_file, mode, log_content in writes:
+        _ensure_dir(log_file.parent, known_dirs)
+        fd = os.open(log_file, _LOG_OPEN_FLAGS[mode], 0o644)
+        try:
+            with memoryview(log_content) as view:
+                written = 0
+                while written < len(view):
+                    written += os.write(fd, view[written:])
+        finally:
+            os.close(fd)
+        if mode == 'wb':
+            # A full rewrite supersedes any compressed copy
+            log_file.with_name(log_file.name + _COMPRESSED_SUFFIX).unlink(missing_ok=True)
+
+
+def _pack_log_rows(steps: List[Step]) -> List[Tuple[str, bytes]]:
+    """Build the step_logs rows of finished steps"""
+    return [(step.id, _pack_log_blob(step.logs)) for step in steps]
+
+
+def _remove_log_files(log_files: List[Path]):
+    """Delete step log files, plain or compressed, that may not exist"""
+    for log_file in log_files:
+        log_file.unlink(missing_ok=True)
+        log_file.with_name(log_file.name + _COMPRESSED_SUFFIX).unlink(missing_ok=True)
+
+
+def _compress_log_files(execution_dir: Path):
+    """Replace the step log files of a finished execution with zstd-compressed copies"""
+    compressor = zstandard.ZstdCompressor(level=3)
+    for log_file in execution_dir.glob("step_*.log"):
+        try:
+            before = log_file.stat()
+            if before.st_size < LOG_COMPRESS_MIN_SIZE:
+                continue
+            
+            compressed_file = log_file.with_name(log_file.name + _COMPRESSED_SUFFIX)
+            tmp_file = compressed_file.with_name(compressed_file.name + ".tmp")
+            tmp_file.write_bytes(compressor.compress(log_file.read_bytes()))
+            os.replace(tmp_file, compressed_file)
+            
+            after = log_file.stat()
+            if (after.st_size, after.st_mtime_ns) == (before.st_size, before.st_mtime_ns):
+                log_file.unlink()
+            else:
+                # Written to while compressing, the plain file is the newer one
+                compressed_file.unlink(missing_ok=True)
+        except Exception as e:
+            logger.error(f"Failed to compress step log {log_file}: {e}")
+
+
+def _pack_log_blob(logs: List[LogEntry]) -> bytes:
+    """Encode the logs of a finished step for the step_logs table, compressed when large"""
+    data = _LOG_MAGIC + _encode_log_entries(logs)
+    if zstandard is not None and len(data) >= LOG_COMPRESS_MIN_SIZE:
+        data = zstandard.ZstdCompressor(level=3).compress(data)
+    return data
+
+
+def _unpack_log_blob(data: bytes) -> List[LogEntry]:
+    """Decode a step_logs row written by _pack_log_blob"""
+    try:
+        if data[:len(_ZSTD_MAGIC)] == _ZSTD_MAGIC:
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read compressed step logs")
+            data = zstandard.ZstdDecompressor().decompress(data)
+        return _decode_log_data(data)
+    except Exception as e:
+        logger.error(f"Failed to load step logs: {e}")
+        return []
+
+
+def _decode_log_data(data) -> List[LogEntry]:
+    """Decode the content of a step log file in either format"""
+    if data[:len(_LOG_MAGIC)] == _LOG_MAGIC:
+        return _decode_log_frames(data)
+    return _decode_legacy_log_text(bytes(data).decode('utf-8'))
+
+
+def _read_log_file(log_file: Path) -> List[LogEntry]:
+    """Read a step log file in one go and decode it into log entries"""
+    try:
+        try:
+            f = open(log_file, 'rb')
+        except FileNotFoundError:
+            compressed_file = log_file.with_name(log_file.name + _COMPRESSED_SUFFIX)
+            try:
+                compressed = compressed_file.read_bytes()
+            except FileNotFoundError:
+                return []
+            if zstandard is None:
+                raise RuntimeError(f"zstandard is required to read {compressed_file}")
+            return _decode_log_data(zstandard.ZstdDecompressor().decompress(compressed))
+        
+        with f:
+            # Large files are decoded straight from the page cache without a copy into a buffer
+            if os.fstat(f.fileno()).st_size >= LOG_MMAP_MIN_SIZE:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                        mapped.madvise(mmap.MADV_SEQUENTIAL)
+                    return _decode_log_data(mapped)
+            data = f.read()
+        return _decode_log_data(data)
+    except Exception as e:
+        logger.error(f"Failed to load step logs: {e}")
+        return []
+
+
+def _loads_dict(value: Optional[str]) -> Dict[str, Any]:
+    """Decode a JSON object column, skipping the parser for the common empty value"""
+    return orjson.loads(value) if value and value != '{}' else {}
+
+
+def _loads_list(value: Optional[str]) -> List[Any]:
+    """Decode a JSON array column, skipping the parser for the common empty value"""
+    return orjson.loads(value) if value and value != '[]' else []
+
+
+# JSON columns of executions, named like the model fields, and the values that decode
+# to the field defaults and so are not handed to the model at all
+_EXECUTION_JSON_COLUMNS = ('environment', 'tags', 'metadata')
+_EMPTY_JSON = frozenset((None, '', '{}', '[]'))
+
+
+# Stored enum values -> members, looked up without going through the Enum constructor
+_EXECUTION_STATUSES = {status.value: status for status in ExecutionStatus}
+_STEP_STATUSES = {status.value: status for status in StepStatus}
+_ARTIFACT_TYPES = {artifact_type.value: artifact_type for artifact_type in ArtifactType}
+
+
+def _micros(value: Optional[datetime]) -> Optional[int]:
+    """Serialize an optional datetime column as microseconds since the epoch"""
+    return (value - _EPOCH) // _ONE_MICROSECOND if value is not None else None
+
+
+def _from_micros(value: Optional[int]) -> Optional[datetime]:
+    """Parse an optional datetime column stored as microseconds since the epoch"""
+    return _EPOCH + timedelta(0, 0, value) if value is not None else None
+
+
+def _micros_from_text(value) -> Optional[int]:
+    """Convert a timestamp column written as ISO text by older versions"""
+    if value is None or isinstance(value, int):
+        return value
+    return _micros(datetime.fromisoformat(value))
+
+
+# Stored columns of each table with the expression over obj that produces their value.
+# The upserts, row builders and read column lists are all generated from these, so
+# adding a column is a one-line change.
+_EXECUTION_FIELDS = (
+    ('id', 'obj.id'),
+    ('name', 'obj.name'),
+    ('command', 'obj.command'),
+    ('working_directory', 'obj.working_directory'),
+    ('status', 'obj.status.value'),
+    ('exit_code', 'obj.exit_code'),
+    ('error_message', 'obj.error_message'),
+    ('created_at', '_micros(obj.created_at)'),
+    ('started_at', '_micros(obj.started_at)'),
+    ('completed_at', '_micros(obj.completed_at)'),
+    ('environment', '_dumps(obj.environment)'),
+    ('user_name', 'obj.user'),
+    ('tags', '_dumps(obj.tags)'),
+    ('total_steps', 'obj.total_steps'),
+    ('completed_steps', 'obj.completed_steps'),
+    ('current_step_index', 'obj.current_step_index'),
+    ('metadata', '_dumps(obj.metadata)'),
+)
+
+_STEP_FIELDS = (
+    ('id', 'obj.id'),
+    ('execution_id', 'obj.execution_id'),
+    ('name', 'obj.name'),
+    ('description', 'obj.description'),
+    ('step_index', 'obj.index'),
+    ('status', 'obj.status.value'),
+    ('exit_code', 'obj.exit_code'),
+    ('error_message', 'obj.error_message'),
+    ('created_at', '_micros(obj.created_at)'),
+    ('started_at', '_micros(obj.started_at)'),
+    ('completed_at', '_micros(obj.completed_at)'),
+    ('estimated_duration', 'obj.estimated_duration'),
+    ('stop_on_error', 'obj.stop_on_error'),
+    ('metadata', '_dumps(obj.metadata)'),
+    ('log_count', 'obj.get_log_count()'),
+    ('last_log_ts', '_micros(obj.get_last_log_at())'),
+)
+
+_ARTIFACT_FIELDS = (
+    ('id', 'obj.id'),
+    ('execution_id', 'obj.execution_id'),
+    ('step_id', 'obj.step_id'),
+    ('name', 'obj.name'),
+    ('description', 'obj.description'),
+    ('file_path', 'obj.file_path'),
+    ('file_name', 'obj.file_name'),
+    ('file_size', 'obj.file_size'),
+    ('mime_type', 'obj.mime_type'),
+    ('artifact_type', 'obj.artifact_type.value'),
+    ('created_at', '_micros(obj.created_at)'),
+    ('tags', '_dumps(obj.tags)'),
+    ('is_public', 'obj.is_public'),
+    ('retention_days', 'obj.retention_days'),
+    ('metadata', '_dumps(obj.metadata)'),
+    ('content_hash', 'obj.content_hash'),
+)
+
+
+def _upsert_sql(table: str, fields: Tuple[Tuple[str, str], ...]) -> str:
+    """Build the INSERT OR REPLACE statement for a table"""
+    columns = ", ".join(name for name, _ in fields)
+    placeholders = ", ".join("?" * len(fields))
+    return f"INSERT OR REPLACE INTO {table} ({columns}) VALUES ({placeholders})"
+
+
+def _compile_row_builder(table: str, fields: Tuple[Tuple[str, str], ...]):
+    """Generate a straight-line function returning the parameter tuple of a row"""
+    name = f"_{table}_row"
+    source = f"def {name}(obj):\n    return ({', '.join(expression for _, expression in fields)},)\n"
+    namespace = {'_dumps': _dumps, '_micros': _micros}
+    exec(compile(source, f"<{table} row builder>", "exec"), namespace)
+    return namespace[name]
+
+
+# Upserts shared by the single-row and batched save methods, with their row builders
+_UPSERT_EXECUTION = _upsert_sql("executions", _EXECUTION_FIELDS)
+_UPSERT_STEP = _upsert_sql("steps", _STEP_FIELDS)
+_UPSERT_ARTIFACT = _upsert_sql("artifacts", _ARTIFACT_FIELDS)
+_UPSERT_STEP_LOG = "INSERT OR REPLACE INTO step_logs (step_id, data) VALUES (?, ?)"
+
+# Statements for the (executions, steps, artifacts, step logs) row lists of a queued save
+_BUNDLE_UPSERTS = (_UPSERT_EXECUTION, _UPSERT_STEP, _UPSERT_ARTIFACT, _UPSERT_STEP_LOG)
+
+_execution_row = _compile_row_builder("executions", _EXECUTION_FIELDS)
+_step_row = _compile_row_builder("steps", _STEP_FIELDS)
+_artifact_row = _compile_row_builder("artifacts", _ARTIFACT_FIELDS)
+
+# Explicit column lists for reads, so rows are looked up by name rather than position
+_EXECUTION_COLUMNS = ", ".join(name for name, _ in _EXECUTION_FIELDS)
+_STEP_COLUMNS = ", ".join(name for name, _ in _STEP_FIELDS)
+_ARTIFACT_COLUMNS = ", ".join(name for name, _ in _ARTIFACT_FIELDS)
+
+
+# Table definitions, formatted with the table name so migrations can build a replacement
+# table next to the live one. Timestamp columns hold microseconds since the epoch.
+_CREATE_EXECUTIONS = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        command TEXT NOT NULL,
+        working_directory TEXT,
+        status TEXT NOT NULL,
+        exit_code INTEGER,
+        error_message TEXT,
+        created_at INTEGER NOT NULL,
+        started_at INTEGER,
+        completed_at INTEGER,
+        environment TEXT,
+        user_name TEXT,
+        tags TEXT,
+        total_steps INTEGER DEFAULT 0,
+        completed_steps INTEGER DEFAULT 0,
+        current_step_index INTEGER DEFAULT -1,
+        metadata TEXT
+    )
+"""
+
+_CREATE_STEPS = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id TEXT PRIMARY KEY,
+        execution_id TEXT NOT NULL,
+        name TEXT NOT NULL,
+        description TEXT,
+        step_index INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        exit_code INTEGER,
+        error_message TEXT,
+        created_at INTEGER NOT NULL,
+        started_at INTEGER,
+        completed_at INTEGER,
+        estimated_duration REAL,
+        stop_on_error BOOLEAN DEFAULT 0,
+        metadata TEXT,
+        log_count INTEGER DEFAULT 0,
+        last_log_ts INTEGER,
+        FOREIGN KEY (execution_id) REFERENCES executions (id)
+    )
+"""
+
+_CREATE_ARTIFACTS = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id TEXT PRIMARY KEY,
+        execution_id TEXT NOT NULL,
+        step_id TEXT,
+        name TEXT NOT NULL,
+        description TEXT,
+        file_path TEXT NOT NULL,
+        file_name TEXT,
+        file_size INTEGER DEFAULT 0,
+        mime_type TEXT,
+        artifact_type TEXT,
+        created_at INTEGER NOT NULL,
+        tags TEXT,
+        is_public BOOLEAN DEFAULT 1,
+        retention_days INTEGER,
+        metadata TEXT,
+        content_hash TEXT,
+        FOREIGN KEY (execution_id) REFERENCES executions (id),
+        FOREIGN KEY (step_id) REFERENCES steps (id)
+    )
+"""
+
+# Logs of finished steps, one encoded blob per step. Logs of running steps are
+# appended to files and move here once the step finishes.
+_CREATE_STEP_LOGS = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        step_id TEXT PRIMARY KEY,
+        data BLOB NOT NULL
+    )
+"""
+
+# Timestamp columns, converted from ISO text when migrating older databases
+_TIMESTAMP_COLUMNS = frozenset(('created_at', 'started_at', 'completed_at', 'last_log_ts'))
+
+# Stored in PRAGMA user_version; 1 is the first version with integer timestamps
+SCHEMA_VERSION = 1
+
+
+# Read statements kept as constants so every call hands SQLite the same text and hits
+# the per-connection statement cache instead of re-preparing
+_SELECT_EXECUTION = f"SELECT {_EXECUTION_COLUMNS} FROM executions WHERE id = ?"
+_SELECT_EXECUTIONS = f"SELECT {_EXECUTION_COLUMNS} FROM executions WHERE 1=1"
+_SELECT_STEPS = f"SELECT {_STEP_COLUMNS} FROM steps WHERE execution_id = ?"
+_SELECT_ARTIFACTS = f"SELECT {_ARTIFACT_COLUMNS} FROM artifacts WHERE execution_id = ? ORDER BY created_at"
+_SELECT_ARTIFACT = f"SELECT {_ARTIFACT_COLUMNS} FROM artifacts WHERE id = ?"
+
+# Prepared statements kept per connection (sqlite3 defaults to 128)
+STATEMENT_CACHE_SIZE = 256
+
+# IDs bound per IN (...) query by the bulk loaders, well under SQLite's variable limit
+BULK_LOAD_CHUNK_SIZE = 500
+
+
+def _clone_file(src: str, dst: Path):
+    """Copy src to dst, sharing extents with a reflink or in-kernel copy where the filesystem allows
+    
+    Hard links are deliberately not used: the stored artifact must stay a snapshot even if
+    the script keeps writing to its own file after registering it.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        shutil.copy2(src, dst)
+        return
+    
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        except OSError:
+            # No reflink support, let the kernel copy without a round trip through user space:
+            # copy_file_range first, then sendfile, which older kernels allow across filesystems
+            size = os.fstat(fsrc.fileno()).st_size
+            for kernel_copy in (_copy_file_range, _sendfile):
+                try:
+                    kernel_copy(fsrc.fileno(), fdst.fileno(), size)
+                    break
+                except (OSError, AttributeError) as e:
+                    if isinstance(e, OSError) and e.errno not in _KERNEL_COPY_UNSUPPORTED:
+                        raise
+                    fdst.seek(0)
+                    fdst.truncate()
+            else:
+                fsrc.seek(0)
+                shutil.copyfileobj(fsrc, fdst)
+    shutil.copystat(src, dst)
+
+
+def _copy_file_range(src_fd: int, dst_fd: int, size: int):
+    """Copy size bytes between file descriptors with copy_file_range"""
+    offset = 0
+    while offset < size:
+        copied = os.copy_file_range(src_fd, dst_fd, size - offset, offset, offset)
+        if copied == 0:
+            break
+        offset += copied
+
+
+def _sendfile(src_fd: int, dst_fd: int, size: int):
+    """Copy size bytes between file descriptors with sendfile"""
+    offset = 0
+    while offset < size:
+        copied = os.sendfile(dst_fd, src_fd, offset, size - offset)
+        if copied == 0:
+            break
+        offset += copied
+
+
+def _store_blob(src: str, blobs_dir: Path, target: Path, known_dirs: set) -> str:
+    """Store src content-addressed under blobs_dir and link it at target, returning the digest
+    
+    The source is snapshotted first and the snapshot is hashed, so a script still writing
+    to src cannot make the stored content disagree with its hash. Raises FileNotFoundError
+    if src does not exist.
+    """
+    _ensure_dir(blobs_dir, known_dirs)
+    _ensure_dir(target.parent, known_dirs)
+    snapshot = blobs_dir / f".{target.name}.tmp"
+    try:
+        _clone_file(src, snapshot)
+        with open(snapshot, 'rb') as f:
+            digest = hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=32)).hexdigest()
+        
+        blob = blobs_dir / digest[:2] / digest
+        if blob.exists():
+            # Identical content is already stored, drop the snapshot
+            snapshot.unlink()
+        else:
+            _ensure_dir(blob.parent, known_dirs)
+            os.replace(snapshot, blob)
+    except BaseException:
+        snapshot.unlink(missing_ok=True)
+        raise
+    
+    target.unlink(missing_ok=True)
+    try:
+        os.link(blob, target)
+    except OSError:
+        # Filesystem without hard links, keep a private copy
+        _clone_file(str(blob), target)
+    return digest
+
+
+class _TTLCache:
+    """Small LRU cache for lookups by ID whose entries expire after ttl seconds"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = 0
+        self._entries: OrderedDict = OrderedDict()
+    
+    def get(self, key: str) -> Any:
+        """Get a live entry, or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+    
+    def put(self, key: str, value: Any, version: int):
+        """Store an entry loaded at the given version, unless an invalidation happened meanwhile"""
+        if version != self.version:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def invalidate(self, keys):
+        """Drop entries that are about to change"""
+        self.version += 1
+        for key in keys:
+            self._entries.pop(key, None)
+    
+    def clear(self):
+        """Drop all entries"""
+        self.version += 1
+        self._entries.clear()
+
 
 class PersistenceLayer:
     """Handles data persistence using SQLite and file system"""
     
-    def __init__(self, storage_path: str = "storage"):
+    def __init__(self, storage_path: str = "storage", read_pool_size: Optional[int] = None):
         self.storage_path = Path(storage_path)
         self.db_path = self.storage_path / "database" / "stepflow.db"
         self.executions_path = self.storage_path / "executions"
         self.artifacts_path = self.storage_path / "artifacts"
+        self.blobs_path = self.artifacts_path / "blobs"
         
         # Ensure directories exist
         self.storage_path.mkdir(exist_ok=True)
@@ -39,6 +648,44 @@ class PersistenceLayer:
         # Connection reuse for high concurrency
         self._db_connection = None
         self._connection_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+        
+        # Number of log entries of each unfinished step already in its log file,
+        # so saves only append what is new instead of rewriting the file
+        self._log_offsets: Dict[Path, int] = {}
+        self._log_lock = asyncio.Lock()
+        
+        # Recently read executions and artifacts by ID, for repeated polling of the same ones
+        self._execution_cache = _TTLCache(maxsize=4096, ttl=5.0)
+        self._artifact_cache = _TTLCache(maxsize=4096, ttl=5.0)
+        
+        # Called with the ids of executions whose rows were just committed, or None after bulk deletes
+        self._change_listeners: List[Callable[[Optional[set]], None]] = []
+        
+        # Storage directories already created, so saves skip the mkdir syscall.
+        # Only touched from executor threads and cleanup; set operations are atomic.
+        self._known_dirs = set()
+        
+        # Background jobs, such as log compression, awaited on close
+        self._background_tasks = set()
+        
+        # Rows of saves waiting for the writer task, which commits them in batches
+        self._write_queue: asyncio.Queue = asyncio.Queue()
+        self._writer_task: Optional[asyncio.Task] = None
+        
+        # Periodic WAL checkpoint, running while the writer connection is open
+        self._checkpoint_task: Optional[asyncio.Task] = None
+        
+        # Log files go through their own small pool so they never queue behind artifact copies.
+        # Created on first use, see _io_pool
+        self._io_executor: Optional[ThreadPoolExecutor] = None
+        
+        # Bounded pool of read-only connections shared by all API reads.
+        # Writes stay on the single connection above since SQLite serializes writers anyway.
+        self._read_pool_size = max(1, read_pool_size or max(4, os.cpu_count() or 1))
+        self._read_pool: asyncio.Queue = asyncio.Queue()
+        self._read_connections: List[aiosqlite.Connection] = []
+        self._read_pool_opening = 0
         
         # Write buffer for batch operations
         self._write_buffer = {
@@ -66,6 +713,9 @@ class PersistenceLayer:
             # Create tables
             await self._create_tables(db)
             
+            # Give the query planner statistics for the composite indexes
+            await self._analyze_if_needed(db)
+            
             self._initialized = True
             logger.info("Persistence layer initialized with WAL mode")
     
@@ -73,285 +723,499 @@ class PersistenceLayer:
         """Get reusable database connection"""
         async with self._connection_lock:
             if self._db_connection is None:
-                self._db_connection = await aiosqlite.connect(str(self.db_path))
+                self._db_connection = await self._connect()
+                self._checkpoint_task = asyncio.create_task(self._checkpoint_loop())
                 logger.info("Database connection established")
             return self._db_connection
     
+    @asynccontextmanager
+    async def _write_connection(self):
+        """Hold the writer connection exclusively so concurrent writes never share a transaction"""
+        db = await self._get_connection()
+        async with self._write_lock:
+            try:
+                yield db
+            except BaseException:
+                # Never leave a half-written transaction for the next writer to commit
+                await db.rollback()
+                raise
+    
+    async def _connect(self, read_only: bool = False) -> aiosqlite.Connection:
+        """Open a database connection with the per-connection PRAGMAs applied"""
+        db = await aiosqlite.connect(str(self.db_path), cached_statements=STATEMENT_CACHE_SIZE)
+        db.row_factory = sqlite3.Row
+        try:
+            # These settings live on the connection, unlike journal_mode=WAL which is stored in the file
+            await db.execute("PRAGMA busy_timeout=5000")    # Wait on a locked database instead of failing
+            await db.execute("PRAGMA cache_size=-65536")    # 64MB page cache
+            await db.execute("PRAGMA temp_store=memory")    # Temp tables in memory
+            await db.execute("PRAGMA mmap_size=268435456")  # 256MB memory mapping
+            if read_only:
+                await db.execute("PRAGMA query_only=ON")
+            else:
+                await db.execute("PRAGMA synchronous=NORMAL")  # Faster than FULL, safe with WAL
+                await db.execute("PRAGMA wal_autocheckpoint=0")  # Checkpoints run in _checkpoint_loop
+        except Exception as e:
+            logger.warning(f"Failed to configure database connection: {e}")
+        return db
+    
     async def _configure_sqlite(self, db):
         """Configure SQLite for optimal performance"""
         try:
             # Enable WAL mode for concurrent reads/writes
-            await db.execute("PRAGMA journal_mode=WAL")
-            
-            # Performance optimizations
-            await db.execute("PRAGMA synchronous=NORMAL")  # Faster than FULL
-            await db.execute("PRAGMA cache_size=10000")     # 10MB cache
-            await db.execute("PRAGMA temp_store=memory")    # Temp tables in memory
-            await db.execute("PRAGMA mmap_size=268435456")  # 256MB memory mapping
+            # Closing the cursor finishes the statement, which would otherwise lock out the checkpoint
+            async with db.execute("PRAGMA journal_mode=WAL"):
+                pass
             
-            # Write optimizations
-            await db.execute("PRAGMA wal_autocheckpoint=1000")  # Auto checkpoint
-            await db.execute("PRAGMA wal_checkpoint(TRUNCATE)") # Clean WAL file
+            # Start from an empty WAL file
+            await db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
             
             logger.info("SQLite WAL mode and optimizations enabled")
         except Exception as e:
             logger.warning(f"Failed to configure SQLite optimizations: {e}")
     
+    @asynccontextmanager
+    async def _read_connection(self):
+        """Borrow a pooled read connection, opening new ones lazily up to the pool size"""
+        opened = len(self._read_connections) + self._read_pool_opening
+        if self._read_pool.empty() and opened < self._read_pool_size:
+            self._read_pool_opening += 1
+            try:
+                db = await self._connect(read_only=True)
+                self._read_connections.append(db)
+            finally:
+                self._read_pool_opening -= 1
+        else:
+            db = await self._read_pool.get()
+        
+        try:
+            yield db
+        finally:
+            self._read_pool.put_nowait(db)
+    
+    @property
+    def _io_pool(self) -> ThreadPoolExecutor:
+        """Executor for log file jobs, created on first use"""
+        if self._io_executor is None:
+            self._io_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="pers-io")
+        return self._io_executor
+    
     async def close(self):
-        """Close database connection"""
+        """Close database connections"""
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        
+        if self._checkpoint_task:
+            self._checkpoint_task.cancel()
+            await asyncio.gather(self._checkpoint_task, return_exceptions=True)
+            self._checkpoint_task = None
+        
+        # Let in-flight log jobs finish in a worker thread, so the event loop keeps running;
+        # the next job after close() starts a new pool
+        io_executor, self._io_executor = self._io_executor, None
+        if io_executor:
+            await asyncio.to_thread(io_executor.shutdown, True)
+        
         async with self._connection_lock:
+            for db in self._read_connections:
+                await db.close()
+            self._read_connections.clear()
+            self._read_pool = asyncio.Queue()
+            
             if self._db_connection:
+                try:
+                    # Refresh planner statistics that went stale during this run
+                    await self._db_connection.execute("PRAGMA optimize")
+                except Exception as e:
+                    logger.warning(f"Failed to optimize database on close: {e}")
                 await self._db_connection.close()
                 self._db_connection = None
                 logger.info("Database connection closed")
     
+    async def _checkpoint_loop(self):
+        """Checkpoint the WAL periodically, so no save pays for an automatic checkpoint inline"""
+        while True:
+            await asyncio.sleep(WAL_CHECKPOINT_INTERVAL)
+            try:
+                async with self._write_connection() as db:
+                    async with db.execute("PRAGMA wal_checkpoint(PASSIVE)") as cursor:
+                        busy, log_frames, checkpointed = await cursor.fetchone()
+                    # After a write burst the whole WAL was copied back, so give its space back too
+                    if not busy and log_frames >= WAL_TRUNCATE_FRAMES and checkpointed == log_frames:
+                        await db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except Exception as e:
+                logger.warning(f"Failed to checkpoint WAL: {e}")
+    
+    async def _analyze_if_needed(self, db: aiosqlite.Connection):
+        """Run ANALYZE once on a large database that was never analyzed"""
+        try:
+            if os.path.getsize(self.db_path) < ANALYZE_MIN_DB_SIZE:
+                return
+            async with db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+            ) as cursor:
+                if await cursor.fetchone():
+                    return
+            await db.execute("ANALYZE")
+            await db.commit()
+            logger.info("Analyzed database for query planning")
+        except Exception as e:
+            logger.warning(f"Failed to analyze database: {e}")
+    
     async def _create_tables(self, db: aiosqlite.Connection):
         """Create database tables"""
         
-        # Executions table
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS executions (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                command TEXT NOT NULL,
-                working_directory TEXT,
-                status TEXT NOT NULL,
-                exit_code INTEGER,
-                error_message TEXT,
-                created_at TEXT NOT NULL,
-                started_at TEXT,
-                completed_at TEXT,
-                environment TEXT,
-                user_name TEXT,
-                tags TEXT,
-                total_steps INTEGER DEFAULT 0,
-                completed_steps INTEGER DEFAULT 0,
-                current_step_index INTEGER DEFAULT -1,
-                metadata TEXT
-            )
-        """)
-        
-        # Steps table
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS steps (
-                id TEXT PRIMARY KEY,
-                execution_id TEXT NOT NULL,
-                name TEXT NOT NULL,
-                description TEXT,
-                step_index INTEGER NOT NULL,
-                status TEXT NOT NULL,
-                exit_code INTEGER,
-                error_message TEXT,
-                created_at TEXT NOT NULL,
-                started_at TEXT,
-                completed_at TEXT,
-                estimated_duration REAL,
-                stop_on_error BOOLEAN DEFAULT 0,
-                metadata TEXT,
-                FOREIGN KEY (execution_id) REFERENCES executions (id)
-            )
-        """)
-        
-        # Artifacts table
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS artifacts (
-                id TEXT PRIMARY KEY,
-                execution_id TEXT NOT NULL,
-                step_id TEXT,
-                name TEXT NOT NULL,
-                description TEXT,
-                file_path TEXT NOT NULL,
-                file_name TEXT,
-                file_size INTEGER DEFAULT 0,
-                mime_type TEXT,
-                artifact_type TEXT,
-                created_at TEXT NOT NULL,
-                tags TEXT,
-                is_public BOOLEAN DEFAULT 1,
-                retention_days INTEGER,
-                metadata TEXT,
-                FOREIGN KEY (execution_id) REFERENCES executions (id),
-                FOREIGN KEY (step_id) REFERENCES steps (id)
-            )
-        """)
+        # Executions, steps and artifacts tables
+        await db.execute(_CREATE_EXECUTIONS.format(table="executions"))
+        await db.execute(_CREATE_STEPS.format(table="steps"))
+        await db.execute(_CREATE_ARTIFACTS.format(table="artifacts"))
+        await db.execute(_CREATE_STEP_LOGS.format(table="step_logs"))
+        
+        # Add columns missing from databases created by older versions
+        async with db.execute("PRAGMA table_info(steps)") as cursor:
+            step_columns = {row[1] for row in await cursor.fetchall()}
+        if 'log_count' not in step_columns:
+            await db.execute("ALTER TABLE steps ADD COLUMN log_count INTEGER DEFAULT 0")
+        if 'last_log_ts' not in step_columns:
+            await db.execute("ALTER TABLE steps ADD COLUMN last_log_ts INTEGER")
+        
+        async with db.execute("PRAGMA table_info(artifacts)") as cursor:
+            artifact_columns = {row[1] for row in await cursor.fetchall()}
+        if 'content_hash' not in artifact_columns:
+            await db.execute("ALTER TABLE artifacts ADD COLUMN content_hash TEXT")
         
-        # Create indexes
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_executions_status ON executions (status)")
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_executions_created_at ON executions (created_at)")
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_executions_user ON executions (user_name)")
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_steps_execution_id ON steps (execution_id)")
+        async with db.execute("PRAGMA user_version") as cursor:
+            (schema_version,) = await cursor.fetchone()
+        if schema_version < SCHEMA_VERSION:
+            await self._migrate_timestamps(db)
+            await db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        
+        # Create indexes matching the WHERE + ORDER BY of the read queries, so listings
+        # are index range scans instead of a filter followed by a sort
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_executions_created ON executions (created_at, id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_executions_status_created ON executions (status, created_at, id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_executions_user_created ON executions (user_name, created_at, id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_steps_exec_index ON steps (execution_id, step_index)")
         await db.execute("CREATE INDEX IF NOT EXISTS idx_steps_status ON steps (status)")
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_artifacts_execution_id ON artifacts (execution_id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_artifacts_exec_created ON artifacts (execution_id, created_at)")
         await db.execute("CREATE INDEX IF NOT EXISTS idx_artifacts_step_id ON artifacts (step_id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_artifacts_content_hash ON artifacts (content_hash)")
+        
+        # Single-column indexes that are now a prefix of the composites above only cost writes
+        for index in ("idx_executions_status", "idx_executions_created_at", "idx_executions_user",
+                      "idx_steps_execution_id", "idx_artifacts_execution_id"):
+            await db.execute(f"DROP INDEX IF EXISTS {index}")
+        await db.commit()
+    
+    async def _migrate_timestamps(self, db: aiosqlite.Connection):
+        """Rebuild tables created with ISO text timestamps so they store integer microseconds"""
+        for table, create_sql, fields in (
+            ("executions", _CREATE_EXECUTIONS, _EXECUTION_FIELDS),
+            ("steps", _CREATE_STEPS, _STEP_FIELDS),
+            ("artifacts", _CREATE_ARTIFACTS, _ARTIFACT_FIELDS),
+        ):
+            async with db.execute(f"PRAGMA table_info({table})") as cursor:
+                column_types = {row[1]: row[2].upper() for row in await cursor.fetchall()}
+            if column_types.get('created_at') != 'TEXT':
+                continue
+            
+            columns = [name for name, _ in fields]
+            timestamp_positions = [i for i, name in enumerate(columns) if name in _TIMESTAMP_COLUMNS]
+            new_table = f"_new_{table}"
+            insert = _upsert_sql(new_table, fields)
+            
+            # SQLite cannot change a column type in place: copy into a new table and swap it in
+            await db.execute("BEGIN IMMEDIATE")
+            try:
+                await db.execute(create_sql.format(table=new_table))
+                async with db.execute(f"SELECT {', '.join(columns)} FROM {table}") as cursor:
+                    while True:
+                        rows = await cursor.fetchmany(1000)
+                        if not rows:
+                            break
+                        converted = []
+                        for row in rows:
+                            values = list(row)
+                            for i in timestamp_positions:
+                                values[i] = _micros_from_text(values[i])
+                            converted.append(values)
+                        await db.executemany(insert, converted)
+                await db.execute(f"DROP TABLE {table}")
+                await db.execute(f"ALTER TABLE {new_table} RENAME TO {table}")
+                await db.commit()
+            except BaseException:
+                await db.rollback()
+                raise
+            logger.info(f"Migrated {table} timestamps to integer microseconds")
     
     async def save_execution(self, execution: Execution) -> bool:
         """Save or update execution using optimized connection"""
-        await self._ensure_initialized()
-        
-        try:
-            db = await self._get_connection()
-            await db.execute("""
-                INSERT OR REPLACE INTO executions (
-                    id, name, command, working_directory, status, exit_code, error_message,
-                    created_at, started_at, completed_at, environment, user_name, tags,
-                    total_steps, completed_steps, current_step_index, metadata
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                execution.id, execution.name, execution.command, execution.working_directory,
-                execution.status.value, execution.exit_code, execution.error_message,
-                execution.created_at.isoformat(),
-                execution.started_at.isoformat() if execution.started_at else None,
-                execution.completed_at.isoformat() if execution.completed_at else None,
-                json.dumps(execution.environment), execution.user, json.dumps(execution.tags),
-                execution.total_steps, execution.completed_steps, execution.current_step_index,
-                json.dumps(execution.metadata)
-            ))
-            await db.commit()
-            return True
-        except Exception as e:
-            logger.error(f"Failed to save execution {execution.id}: {e}")
-            return False
+        return await self.save_execution_bundle(execution)
     
     async def save_step(self, step: Step) -> bool:
         """Save or update step using optimized connection and async I/O"""
-        await self._ensure_initialized()
-        
-        try:
-            db = await self._get_connection()
-            await db.execute("""
-                INSERT OR REPLACE INTO steps (
-                    id, execution_id, name, description, step_index, status, exit_code, 
-                    error_message, created_at, started_at, completed_at, estimated_duration, stop_on_error, metadata
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                step.id, step.execution_id, step.name, step.description, step.index,
-                step.status.value, step.exit_code, step.error_message,
-                step.created_at.isoformat(),
-                step.started_at.isoformat() if step.started_at else None,
-                step.completed_at.isoformat() if step.completed_at else None,
-                step.estimated_duration, step.stop_on_error, json.dumps(step.metadata)
-            ))
-            await db.commit()
-            
-            # Save step logs to file asynchronously
-            await self._save_step_logs_async(step)
-            return True
-        except Exception as e:
-            logger.error(f"Failed to save step {step.id}: {e}")
-            return False
+        return await self.save_steps([step])
     
     async def save_artifact(self, artifact: Artifact) -> bool:
         """Save artifact metadata and copy file to storage"""
+        return await self.save_artifacts([artifact])
+    
+    async def save_steps(self, steps: List[Step]) -> bool:
+        """Save or update multiple steps in a single transaction"""
+        return await self.save_execution_bundle(None, steps, ())
+    
+    async def save_artifacts(self, artifacts: List[Artifact]) -> bool:
+        """Save multiple artifacts in a single transaction, copying their files to storage"""
+        return await self.save_execution_bundle(None, (), artifacts)
+    
+    async def save_execution_bundle(
+        self,
+        execution: Optional[Execution],
+        steps: List[Step] = (),
+        artifacts: List[Artifact] = ()
+    ) -> bool:
+        """Save an execution with its steps and artifacts in one transaction"""
+        if execution is None and not steps and not artifacts:
+            return True
+        
         await self._ensure_initialized()
         
         try:
-            # Copy artifact file to storage
-            storage_file_path = await self._store_artifact_file(artifact)
-            if storage_file_path:
-                artifact.file_path = str(storage_file_path)
+            # Logs of finished steps are stored with the rows, the others are appended to their
+            # files while the rows are written since the files do not depend on them
+            finished_steps = [step for step in steps if step.is_finished and step.logs]
+            running_steps = [step for step in steps if not step.is_finished]
+            log_rows = []
+            if finished_steps:
+                log_rows = await asyncio.get_event_loop().run_in_executor(
+                    self._io_pool, _pack_log_rows, finished_steps
+                )
             
-            db = await self._get_connection()
-            await db.execute("""
-                    INSERT OR REPLACE INTO artifacts (
-                        id, execution_id, step_id, name, description, file_path, file_name,
-                        file_size, mime_type, artifact_type, created_at, tags, is_public,
-                        retention_days, metadata
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    artifact.id, artifact.execution_id, artifact.step_id, artifact.name,
-                    artifact.description, artifact.file_path, artifact.file_name,
-                    artifact.file_size, artifact.mime_type, artifact.artifact_type.value,
-                    artifact.created_at.isoformat(), json.dumps(artifact.tags),
-                    artifact.is_public, artifact.retention_days, json.dumps(artifact.metadata)
-                ))
-            await db.commit()
+            if running_steps:
+                await asyncio.gather(
+                    self._write_bundle_rows(execution, steps, artifacts, log_rows),
+                    self._save_step_logs_async(running_steps)
+                )
+            else:
+                await self._write_bundle_rows(execution, steps, artifacts, log_rows)
+            
+            if finished_steps:
+                await self._remove_step_log_files(finished_steps)
+            
+            if zstandard is not None and execution is not None and execution.status in _TERMINAL_STATUSES:
+                self._schedule_log_compression(execution.id)
             return True
         except Exception as e:
-            logger.error(f"Failed to save artifact {artifact.id}: {e}")
+            owner = execution.id if execution is not None else (steps or artifacts)[0].execution_id
+            logger.error(f"Failed to save {len(steps)} steps and {len(artifacts)} artifacts of execution {owner}: {e}")
             return False
     
+    async def _write_bundle_rows(
+        self,
+        execution: Optional[Execution],
+        steps: List[Step],
+        artifacts: List[Artifact],
+        log_rows: List[Tuple[str, bytes]] = ()
+    ):
+        """Store artifact files, then write all rows in a single transaction
+        
+        The rows are queued for the writer task, which may commit them together with
+        those of other saves queued at the same time.
+        """
+        # Copy artifact files to storage before taking the writer
+        if artifacts:
+            storage_file_paths = await asyncio.gather(
+                *(self._store_artifact_file(artifact) for artifact in artifacts)
+            )
+            for artifact, storage_file_path in zip(artifacts, storage_file_paths):
+                if storage_file_path:
+                    artifact.file_path = str(storage_file_path)
+        
+        # Rows are built here so a model that cannot be serialized fails only its own save
+        rows = (
+            [_execution_row(execution)] if execution is not None else [],
+            [_step_row(step) for step in steps],
+            [_artifact_row(artifact) for artifact in artifacts],
+            log_rows
+        )
+        committed = asyncio.get_event_loop().create_future()
+        self._write_queue.put_nowait((rows, committed))
+        if self._writer_task is None:
+            self._writer_task = asyncio.create_task(self._write_queued_rows())
+            self._background_tasks.add(self._writer_task)
+            self._writer_task.add_done_callback(self._background_tasks.discard)
+        await committed
+        
+        # Invalidate after the commit so reads that raced with the write cannot cache the old row
+        if execution is not None:
+            self._execution_cache.invalidate((execution.id,))
+        if artifacts:
+            self._artifact_cache.invalidate([artifact.id for artifact in artifacts])
+        if self._change_listeners:
+            execution_ids = {step.execution_id for step in steps}
+            execution_ids.update(artifact.execution_id for artifact in artifacts)
+            if execution is not None:
+                execution_ids.add(execution.id)
+            self._notify_changed(execution_ids)
+    
+    def add_change_listener(self, callback: Callable[[Optional[set]], None]):
+        """Register a callback told which executions changed, for caches kept outside this layer"""
+        self._change_listeners.append(callback)
+    
+    def _notify_changed(self, execution_ids: Optional[set]):
+        """Tell listeners that rows of these executions changed, or None if any may have"""
+        for callback in self._change_listeners:
+            try:
+                callback(execution_ids)
+            except Exception as e:
+                logger.error(f"Change listener failed: {e}")
+    
+    async def _write_queued_rows(self):
+        """Commit queued rows, up to _buffer_size saves per transaction, until the queue is empty"""
+        try:
+            while not self._write_queue.empty():
+                batch = [self._write_queue.get_nowait()
+                         for _ in range(min(self._buffer_size, self._write_queue.qsize()))]
+                try:
+                    async with self._write_connection() as db:
+                        # Take the write lock up front rather than upgrading a deferred transaction mid-batch
+                        await db.execute("BEGIN IMMEDIATE")
+                        # Queue order is kept, so the latest save of a row is the one that sticks
+                        for index, statement in enumerate(_BUNDLE_UPSERTS):
+                            table_rows = [row for rows, _ in batch for row in rows[index]]
+                            if table_rows:
+                                await db.executemany(statement, table_rows)
+                        await db.commit()
+                except Exception as e:
+                    for _, committed in batch:
+                        if not committed.done():
+                            committed.set_exception(e)
+                    continue
+                except BaseException:
+                    for _, committed in batch:
+                        committed.cancel()
+                    raise
+                
+                for _, committed in batch:
+                    if not committed.done():
+                        committed.set_result(None)
+        finally:
+            # Saves from here on start a new writer task
+            self._writer_task = None
+    
     async def _store_artifact_file(self, artifact: Artifact) -> Optional[Path]:
         """Copy artifact file to persistent storage"""
-        if not artifact.file_path or not os.path.exists(artifact.file_path):
+        if not artifact.file_path:
             return None
         
+        # Execution-specific directory and unique filename
+        target_path = self.artifacts_path / artifact.execution_id / f"{artifact.id}_{Path(artifact.file_path).name}"
+        
         try:
-            # Create execution-specific directory
-            execution_artifacts_dir = self.artifacts_path / artifact.execution_id
-            execution_artifacts_dir.mkdir(exist_ok=True)
-            
-            # Generate unique filename
-            original_path = Path(artifact.file_path)
-            target_path = execution_artifacts_dir / f"{artifact.id}_{original_path.name}"
-            
-            # Copy file
-            await asyncio.get_event_loop().run_in_executor(
-                None, shutil.copy2, artifact.file_path, target_path
+            # Store the content once by hash and hard link it into the execution directory.
+            # All filesystem calls happen in the executor, a missing source surfaces as FileNotFoundError.
+            artifact.content_hash = await asyncio.get_event_loop().run_in_executor(
+                None, _store_blob, artifact.file_path, self.blobs_path, target_path, self._known_dirs
             )
-            
             return target_path
+        except FileNotFoundError:
+            return None
         except Exception as e:
             logger.error(f"Failed to store artifact file: {e}")
             return None
     
     async def _save_step_logs(self, step: Step):
-        """Save step logs to file (legacy sync method)"""
+        """Save step logs to file (legacy full rewrite)"""
         if not step.logs:
             return
         
         try:
-            # Create execution-specific directory
-            execution_logs_dir = self.executions_path / step.execution_id
-            execution_logs_dir.mkdir(exist_ok=True)
-            
             # Save logs
-            log_file = execution_logs_dir / f"step_{step.index}_{step.id}.log"
-            with open(log_file, 'w', encoding='utf-8') as f:
-                for log_entry in step.logs:
-                    f.write(f"[{log_entry.timestamp.isoformat()}] {log_entry.content}\n")
+            await asyncio.get_event_loop().run_in_executor(
+                self._io_pool, _write_log_files,
+                [(self._step_log_path(step), 'wb', _LOG_MAGIC + _encode_log_entries(step.logs))], self._known_dirs
+            )
         except Exception as e:
             logger.error(f"Failed to save step logs: {e}")
     
-    async def _save_step_logs_async(self, step: Step):
-        """Save step logs to file using async I/O for better performance"""
-        if not step.logs:
-            return
-        
-        try:
-            # Create execution-specific directory
-            execution_logs_dir = self.executions_path / step.execution_id
-            execution_logs_dir.mkdir(exist_ok=True)
-            
-            # Prepare log content
-            log_file = execution_logs_dir / f"step_{step.index}_{step.id}.log"
-            log_content = "\n".join([
-                f"[{log_entry.timestamp.isoformat()}] {log_entry.content}"
-                for log_entry in step.logs
-            ]) + "\n"
-            
-            # Use thread executor for I/O to avoid blocking event loop
-            def write_logs():
-                with open(log_file, 'w', encoding='utf-8') as f:
-                    f.write(log_content)
+    async def _save_step_logs_async(self, steps: List[Step]):
+        """Append log entries added since the last save of each step to its log file"""
+        async with self._log_lock:
+            writes = []
+            log_files = [self._step_log_path(step) for step in steps]
+            for step, log_file in zip(steps, log_files):
+                written = self._log_offsets.get(log_file)
+                # Unknown or stale offsets fall back to rewriting the whole file
+                mode = 'ab' if written is not None and written <= len(step.logs) else 'wb'
+                new_logs = step.logs[written:] if mode == 'ab' else step.logs
+                if new_logs:
+                    log_content = _encode_log_entries(new_logs)
+                    if mode == 'wb':
+                        log_content = _LOG_MAGIC + log_content
+                    writes.append((log_file, mode, log_content))
             
-            await asyncio.get_event_loop().run_in_executor(None, write_logs)
+            try:
+                if writes:
+                    await asyncio.get_event_loop().run_in_executor(
+                        self._io_pool, _write_log_files, writes, self._known_dirs
+                    )
+            except Exception as e:
+                logger.error(f"Failed to save step logs asynchronously: {e}")
+                for log_file in log_files:
+                    self._log_offsets.pop(log_file, None)
+                return
             
-        except Exception as e:
-            logger.error(f"Failed to save step logs asynchronously: {e}")
+            # Finished steps get no more logs, so stop tracking them
+            for step, log_file in zip(steps, log_files):
+                if step.is_finished:
+                    self._log_offsets.pop(log_file, None)
+                else:
+                    self._log_offsets[log_file] = len(step.logs)
+    
+    async def _remove_step_log_files(self, steps: List[Step]):
+        """Delete the log files of steps whose logs are now stored in the database"""
+        async with self._log_lock:
+            log_files = [self._step_log_path(step) for step in steps]
+            for log_file in log_files:
+                self._log_offsets.pop(log_file, None)
+            await asyncio.get_event_loop().run_in_executor(self._io_pool, _remove_log_files, log_files)
+    
+    def _schedule_log_compression(self, execution_id: str):
+        """Compress the step logs of a finished execution in the background"""
+        task = asyncio.create_task(self._compress_execution_logs(execution_id))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def _compress_execution_logs(self, execution_id: str):
+        """Compress the step log files of an execution on the I/O pool"""
+        execution_dir = self.executions_path / execution_id
+        async with self._log_lock:
+            # Later saves of these steps must rewrite their log file rather than append to it
+            for log_file in [path for path in self._log_offsets if path.parent == execution_dir]:
+                del self._log_offsets[log_file]
+        
+        await asyncio.get_event_loop().run_in_executor(self._io_pool, _compress_log_files, execution_dir)
     
     async def get_execution(self, execution_id: str) -> Optional[Execution]:
         """Get execution by ID"""
+        execution = self._execution_cache.get(execution_id)
+        if execution is not None:
+            return execution
+        
         await self._ensure_initialized()
         
         try:
-            db = await self._get_connection()
-            async with db.execute(
-                "SELECT * FROM executions WHERE id = ?", (execution_id,)
-            ) as cursor:
-                row = await cursor.fetchone()
-                if row:
-                    return self._row_to_execution(row)
-            return None
+            version = self._execution_cache.version
+            async with self._read_connection() as db:
+                async with db.execute(
+                    _SELECT_EXECUTION, (execution_id,)
+                ) as cursor:
+                    row = await cursor.fetchone()
+            if not row:
+                return None
+            execution = self._row_to_execution(row)
+            self._execution_cache.put(execution_id, execution, version)
+            return execution
         except Exception as e:
             logger.error(f"Failed to get execution {execution_id}: {e}")
             return None
@@ -361,13 +1225,18 @@ class PersistenceLayer:
         limit: int = 100, 
         offset: int = 0,
         status: Optional[ExecutionStatus] = None,
-        user: Optional[str] = None
+        user: Optional[str] = None,
+        cursor: Optional[Tuple[datetime, str]] = None
     ) -> List[Execution]:
-        """Get executions with filtering and pagination"""
+        """Get executions with filtering and pagination
+        
+        When cursor is given as (created_at, id) of the last row already seen,
+        keyset pagination is used and offset is ignored.
+        """
         await self._ensure_initialized()
         
         try:
-            query = "SELECT * FROM executions WHERE 1=1"
+            query = _SELECT_EXECUTIONS
             params = []
             
             if status:
@@ -378,196 +1247,399 @@ class PersistenceLayer:
                 query += " AND user_name = ?"
                 params.append(user)
             
-            query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
-            params.extend([limit, offset])
+            if cursor:
+                # Keyset pagination: seek past the cursor instead of scanning skipped rows
+                query += " AND (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC LIMIT ?"
+                params.extend([_micros(cursor[0]), cursor[1], limit])
+            else:
+                query += " ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?"
+                params.extend([limit, offset])
             
-            db = await self._get_connection()
-            async with db.execute(query, params) as cursor:
-                rows = await cursor.fetchall()
-                return [self._row_to_execution(row) for row in rows]
+            async with self._read_connection() as db:
+                async with db.execute(query, params) as cursor:
+                    rows = await cursor.fetchall()
+            return [self._row_to_execution(row) for row in rows]
         except Exception as e:
             logger.error(f"Failed to get executions: {e}")
             return []
     
-    async def get_steps(self, execution_id: str) -> List[Step]:
-        """Get all steps for an execution"""
+    async def get_execution_stats(self) -> Dict[str, Any]:
+        """Aggregate execution counts and durations in SQL instead of loading rows"""
         await self._ensure_initialized()
         
         try:
-            db = await self._get_connection()
+            async with self._read_connection() as db:
+                async with db.execute("""
+                    SELECT status,
+                           COUNT(*),
+                           AVG(CASE WHEN started_at IS NOT NULL AND completed_at IS NOT NULL
+                               THEN (completed_at - started_at) / 1000000.0 END)
+                    FROM executions
+                    GROUP BY status
+                """) as cursor:
+                    rows = await cursor.fetchall()
+            
+            status_breakdown = {row[0]: row[1] for row in rows}
+            avg_durations = {row[0]: row[2] for row in rows}
+            
+            return {
+                "total_executions": sum(status_breakdown.values()),
+                "status_breakdown": status_breakdown,
+                # Only completed executions count towards the average to avoid inflated values
+                "avg_duration": avg_durations.get(ExecutionStatus.COMPLETED.value) or 0,
+                "completed_executions": status_breakdown.get(ExecutionStatus.COMPLETED.value, 0)
+            }
+        except Exception as e:
+            logger.error(f"Failed to get execution stats: {e}")
+            return {
+                "total_executions": 0,
+                "status_breakdown": {},
+                "avg_duration": 0,
+                "completed_executions": 0
+            }
+    
+    async def count_by_status(self) -> Dict[str, int]:
+        """Get execution counts grouped by status"""
+        await self._ensure_initialized()
+        
+        async with self._read_connection() as db:
             async with db.execute(
-                "SELECT * FROM steps WHERE execution_id = ? ORDER BY step_index",
-                (execution_id,)
+                "SELECT status, COUNT(*) FROM executions GROUP BY status"
             ) as cursor:
-                rows = await cursor.fetchall()
-                steps = []
-                for row in rows:
-                    step = self._row_to_step(row)
-                    # Load logs from file
-                    await self._load_step_logs(step)
-                    steps.append(step)
-                return steps
+                return {row[0]: row[1] for row in await cursor.fetchall()}
+    
+    async def get_execution_bundle(
+        self, execution_id: str
+    ) -> Optional[Tuple[Execution, List[Step], List[Artifact]]]:
+        """Get execution together with its steps and artifacts"""
+        # Run all three lookups concurrently on pooled connections; for an unknown id the
+        # step and artifact queries simply come back empty
+        execution, steps, artifacts = await asyncio.gather(
+            self.get_execution(execution_id),
+            self.get_steps(execution_id, include_logs=True),
+            self.get_artifacts(execution_id)
+        )
+        if not execution:
+            return None
+        return execution, steps, artifacts
+    
+    async def get_steps(
+        self, execution_id: str, step_id: Optional[str] = None, include_logs: bool = False
+    ) -> List[Step]:
+        """Get all steps for an execution, or only the one matching step_id
+        
+        Step logs live in files and are only read when include_logs is set.
+        """
+        await self._ensure_initialized()
+        
+        try:
+            query = _SELECT_STEPS
+            params = [execution_id]
+            
+            if step_id:
+                query += " AND id = ?"
+                params.append(step_id)
+            
+            query += " ORDER BY step_index"
+            
+            async with self._read_connection() as db:
+                async with db.execute(query, params) as cursor:
+                    rows = await cursor.fetchall()
+            
+            steps = [self._row_to_step(row) for row in rows]
+            
+            # Load logs from file after the connection is back in the pool
+            if include_logs:
+                await self._load_step_logs(steps)
+            return steps
         except Exception as e:
             logger.error(f"Failed to get steps for execution {execution_id}: {e}")
             return []
     
+    async def get_steps_bulk(
+        self, execution_ids: List[str], include_logs: bool = False
+    ) -> Dict[str, List[Step]]:
+        """Get the steps of several executions with one query per chunk of IDs
+        
+        Every requested ID is present in the result, mapped to an empty list if it has no steps.
+        """
+        await self._ensure_initialized()
+        
+        result = {execution_id: [] for execution_id in execution_ids}
+        try:
+            rows = await self._fetch_in_chunks(
+                f"SELECT {_STEP_COLUMNS} FROM steps WHERE execution_id IN ({{}}) ORDER BY execution_id, step_index",
+                list(result)
+            )
+            
+            steps = [self._row_to_step(row) for row in rows]
+            for step in steps:
+                result[step.execution_id].append(step)
+            
+            if include_logs:
+                await self._load_step_logs(steps)
+            return result
+        except Exception as e:
+            logger.error(f"Failed to get steps for {len(result)} executions: {e}")
+            return result
+    
+    async def _load_step_logs(self, steps: List[Step]):
+        """Load the logs of steps from the step_logs table, falling back to their log files
+        
+        Running steps and steps finished before logs moved into the database have files.
+        Blobs and files are decoded in parallel on the I/O pool.
+        """
+        if not steps:
+            return
+        
+        rows = await self._fetch_in_chunks(
+            "SELECT step_id, data FROM step_logs WHERE step_id IN ({})", [step.id for step in steps]
+        )
+        blobs = {row[0]: row[1] for row in rows}
+        
+        loop = asyncio.get_event_loop()
+        step_logs = await asyncio.gather(*(
+            loop.run_in_executor(self._io_pool, _unpack_log_blob, blobs[step.id]) if step.id in blobs
+            else loop.run_in_executor(self._io_pool, _read_log_file, self._step_log_path(step))
+            for step in steps
+        ))
+        for step, logs in zip(steps, step_logs):
+            step.logs = logs
+    
+    async def _fetch_in_chunks(self, query: str, ids: List[str]) -> List[sqlite3.Row]:
+        """Run a query whose {} placeholder takes an IN list, chunking the IDs on one connection"""
+        rows = []
+        async with self._read_connection() as db:
+            for start in range(0, len(ids), BULK_LOAD_CHUNK_SIZE):
+                chunk = ids[start:start + BULK_LOAD_CHUNK_SIZE]
+                async with db.execute(query.format(", ".join("?" * len(chunk))), chunk) as cursor:
+                    rows.extend(await cursor.fetchall())
+        return rows
+    
+    async def get_execution_logs(
+        self,
+        execution_id: str,
+        step_id: Optional[str] = None,
+        after: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[Tuple[Step, LogEntry]]:
+        """Get log entries of an execution in timestamp order, paired with their step"""
+        steps = await self.get_steps(execution_id, step_id=step_id, include_logs=True)
+        
+        # Each step's logs are stored in the order they were written, so a k-way
+        # merge over the steps yields global timestamp order without a full sort
+        merged = heapq.merge(
+            *([(step, log) for log in step.logs] for step in steps),
+            key=lambda item: item[1].timestamp
+        )
+        if after:
+            merged = (item for item in merged if item[1].timestamp > after)
+        return list(itertools.islice(merged, limit))
+    
     async def get_artifacts(self, execution_id: str) -> List[Artifact]:
         """Get all artifacts for an execution"""
         await self._ensure_initialized()
         
         try:
-            db = await self._get_connection()
-            async with db.execute(
-                "SELECT * FROM artifacts WHERE execution_id = ? ORDER BY created_at",
-                (execution_id,)
-            ) as cursor:
-                rows = await cursor.fetchall()
-                return [self._row_to_artifact(row) for row in rows]
+            async with self._read_connection() as db:
+                async with db.execute(
+                    _SELECT_ARTIFACTS,
+                    (execution_id,)
+                ) as cursor:
+                    rows = await cursor.fetchall()
+            return [self._row_to_artifact(row) for row in rows]
         except Exception as e:
             logger.error(f"Failed to get artifacts for execution {execution_id}: {e}")
             return []
     
+    async def get_artifacts_bulk(self, execution_ids: List[str]) -> Dict[str, List[Artifact]]:
+        """Get the artifacts of several executions with one query per chunk of IDs"""
+        await self._ensure_initialized()
+        
+        result = {execution_id: [] for execution_id in execution_ids}
+        try:
+            rows = await self._fetch_in_chunks(
+                f"SELECT {_ARTIFACT_COLUMNS} FROM artifacts WHERE execution_id IN ({{}}) ORDER BY execution_id, created_at",
+                list(result)
+            )
+            for row in rows:
+                artifact = self._row_to_artifact(row)
+                result[artifact.execution_id].append(artifact)
+            return result
+        except Exception as e:
+            logger.error(f"Failed to get artifacts for {len(result)} executions: {e}")
+            return result
+    
     async def get_artifact(self, artifact_id: str) -> Optional[Artifact]:
         """Get artifact by ID"""
+        artifact = self._artifact_cache.get(artifact_id)
+        if artifact is not None:
+            return artifact
+        
         await self._ensure_initialized()
         
         try:
-            db = await self._get_connection()
-            async with db.execute(
-                "SELECT * FROM artifacts WHERE id = ?", (artifact_id,)
-            ) as cursor:
-                row = await cursor.fetchone()
-                if row:
-                    return self._row_to_artifact(row)
-            return None
+            version = self._artifact_cache.version
+            async with self._read_connection() as db:
+                async with db.execute(
+                    _SELECT_ARTIFACT, (artifact_id,)
+                ) as cursor:
+                    row = await cursor.fetchone()
+            if not row:
+                return None
+            artifact = self._row_to_artifact(row)
+            self._artifact_cache.put(artifact_id, artifact, version)
+            return artifact
         except Exception as e:
             logger.error(f"Failed to get artifact {artifact_id}: {e}")
             return None
     
-    async def _load_step_logs(self, step: Step):
-        """Load step logs from file"""
-        try:
-            log_file = self.executions_path / step.execution_id / f"step_{step.index}_{step.id}.log"
-            if log_file.exists():
-                with open(log_file, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and line.startswith('['):
-                            # Parse timestamp and content
-                            parts = line.split('] ', 1)
-                            if len(parts) == 2:
-                                timestamp_str = parts[0][1:]  # Remove [
-                                content = parts[1]
-                                try:
-                                    timestamp = datetime.fromisoformat(timestamp_str)
-                                    step.add_log(content)
-                                    step.logs[-1].timestamp = timestamp
-                                except ValueError:
-                                    step.add_log(line)
-        except Exception as e:
-            logger.error(f"Failed to load step logs: {e}")
+    def _step_log_path(self, step: Step) -> Path:
+        """Path of the log file of a step"""
+        return self.executions_path / step.execution_id / f"step_{step.index}_{step.id}.log"
     
     async def cleanup_expired_data(self, days: int = 30):
         """Clean up old executions and artifacts"""
         await self._ensure_initialized()
         
         try:
-            cutoff_date = datetime.now() - timedelta(days=days)
-            cutoff_str = cutoff_date.isoformat()
-            
-            db = await self._get_connection()
-            # Get executions to delete
-            async with db.execute(
-                "SELECT id FROM executions WHERE created_at < ?", (cutoff_str,)
-            ) as cursor:
-                execution_ids = [row[0] for row in await cursor.fetchall()]
-            
-            # Delete from database
-            await db.execute("DELETE FROM artifacts WHERE execution_id IN ({})".format(
-                ','.join('?' * len(execution_ids))
-            ), execution_ids)
-            await db.execute("DELETE FROM steps WHERE execution_id IN ({})".format(
-                ','.join('?' * len(execution_ids))
-            ), execution_ids)
-            await db.execute("DELETE FROM executions WHERE id IN ({})".format(
-                ','.join('?' * len(execution_ids))
-            ), execution_ids)
-            await db.commit()
+            cutoff = _micros(datetime.now() - timedelta(days=days))
             
-            # Delete files
-            for execution_id in execution_ids:
-                execution_dir = self.executions_path / execution_id
-                artifacts_dir = self.artifacts_path / execution_id
+            async with self._write_connection() as db:
+                # One write transaction, so the rows deleted are exactly the ones selected here
+                await db.execute("BEGIN IMMEDIATE")
+                
+                # Get executions to delete, needed for their directories
+                async with db.execute(
+                    "SELECT id FROM executions WHERE created_at < ?", (cutoff,)
+                ) as cursor:
+                    execution_ids = [row[0] for row in await cursor.fetchall()]
+                
+                if not execution_ids:
+                    await db.rollback()
+                    return
+                
+                # Blobs referenced only by the deleted artifacts, released below
+                async with db.execute("""
+                    SELECT DISTINCT content_hash FROM artifacts
+                    WHERE execution_id IN (SELECT id FROM executions WHERE created_at < ?)
+                    AND content_hash IS NOT NULL
+                    AND content_hash NOT IN (
+                        SELECT content_hash FROM artifacts
+                        WHERE execution_id NOT IN (SELECT id FROM executions WHERE created_at < ?)
+                        AND content_hash IS NOT NULL
+                    )
+                """, (cutoff, cutoff)) as cursor:
+                    content_hashes = [row[0] for row in await cursor.fetchall()]
                 
-                if execution_dir.exists():
-                    shutil.rmtree(execution_dir, ignore_errors=True)
-                if artifacts_dir.exists():
-                    shutil.rmtree(artifacts_dir, ignore_errors=True)
+                # Children first, while the subqueries still see the expired executions
+                await db.execute("""
+                    DELETE FROM step_logs WHERE step_id IN (
+                        SELECT id FROM steps WHERE execution_id IN (SELECT id FROM executions WHERE created_at < ?)
+                    )
+                """, (cutoff,))
+                await db.execute(
+                    "DELETE FROM artifacts WHERE execution_id IN (SELECT id FROM executions WHERE created_at < ?)",
+                    (cutoff,)
+                )
+                await db.execute(
+                    "DELETE FROM steps WHERE execution_id IN (SELECT id FROM executions WHERE created_at < ?)",
+                    (cutoff,)
+                )
+                await db.execute("DELETE FROM executions WHERE created_at < ?", (cutoff,))
+                await db.commit()
+            
+            self._execution_cache.clear()
+            self._artifact_cache.clear()
+            self._notify_changed(None)
+            
+            # Delete files, removing directories in parallel
+            loop = asyncio.get_event_loop()
+            directories = [
+                path
+                for execution_id in execution_ids
+                for path in (self.executions_path / execution_id, self.artifacts_path / execution_id)
+            ]
+            self._known_dirs.difference_update(directories)
+            await asyncio.gather(*(
+                loop.run_in_executor(None, shutil.rmtree, directory, True) for directory in directories
+            ))
+            for content_hash in content_hashes:
+                (self.blobs_path / content_hash[:2] / content_hash).unlink(missing_ok=True)
             
             logger.info(f"Cleaned up {len(execution_ids)} old executions")
         except Exception as e:
             logger.error(f"Failed to cleanup expired data: {e}")
     
-    def _row_to_execution(self, row) -> Execution:
-        """Convert database row to Execution object"""
-        return Execution.from_dict({
-            'id': row[0],
-            'name': row[1],
-            'command': row[2],
-            'working_directory': row[3],
-            'status': row[4],
-            'exit_code': row[5],
-            'error_message': row[6],
-            'created_at': row[7],
-            'started_at': row[8],
-            'completed_at': row[9],
-            'environment': json.loads(row[10]) if row[10] else {},
-            'user': row[11],
-            'tags': json.loads(row[12]) if row[12] else [],
-            'total_steps': row[13],
-            'completed_steps': row[14],
-            'current_step_index': row[15],
-            'metadata': json.loads(row[16]) if row[16] else {}
-        })
-    
-    def _row_to_step(self, row) -> Step:
+    def _row_to_execution(self, row: sqlite3.Row) -> Execution:
+        """Convert database row to Execution object
+        
+        Constructs the model directly instead of going through from_dict, so no
+        intermediate dict is built and no default id or timestamp is generated.
+        Non-empty JSON columns are handed over undecoded and parsed on first access.
+        """
+        execution = Execution(
+            id=row['id'],
+            name=row['name'],
+            command=row['command'],
+            working_directory=row['working_directory'],
+            status=_EXECUTION_STATUSES[row['status']],
+            exit_code=row['exit_code'],
+            error_message=row['error_message'],
+            created_at=_from_micros(row['created_at']),
+            started_at=_from_micros(row['started_at']),
+            completed_at=_from_micros(row['completed_at']),
+            user=row['user_name'],
+            total_steps=row['total_steps'],
+            completed_steps=row['completed_steps'],
+            current_step_index=row['current_step_index']
+        )
+        json_fields = {name: row[name] for name in _EXECUTION_JSON_COLUMNS if row[name] not in _EMPTY_JSON}
+        if json_fields:
+            execution.set_json_fields(json_fields)
+        return execution
+    
+    def _row_to_step(self, row: sqlite3.Row) -> Step:
         """Convert database row to Step object"""
-        return Step.from_dict({
-            'id': row[0],
-            'execution_id': row[1],
-            'name': row[2],
-            'description': row[3],
-            'index': row[4],
-            'status': row[5],
-            'exit_code': row[6],
-            'error_message': row[7],
-            'created_at': row[8],
-            'started_at': row[9],
-            'completed_at': row[10],
-            'estimated_duration': row[11],
-            'stop_on_error': bool(row[12]) if row[12] is not None else False,
-            'metadata': json.loads(row[13]) if row[13] else {}
-        })
-    
-    def _row_to_artifact(self, row) -> Artifact:
+        return Step(
+            id=row['id'],
+            execution_id=row['execution_id'],
+            name=row['name'],
+            description=row['description'],
+            index=row['step_index'],
+            status=_STEP_STATUSES[row['status']],
+            exit_code=row['exit_code'],
+            error_message=row['error_message'],
+            stop_on_error=bool(row['stop_on_error']),
+            created_at=_from_micros(row['created_at']),
+            started_at=_from_micros(row['started_at']),
+            completed_at=_from_micros(row['completed_at']),
+            estimated_duration=row['estimated_duration'],
+            metadata=_loads_dict(row['metadata']),
+            log_count=row['log_count'] or 0,
+            last_log_at=_from_micros(row['last_log_ts'])
+        )
+    
+    def _row_to_artifact(self, row: sqlite3.Row) -> Artifact:
         """Convert database row to Artifact object"""
-        return Artifact.from_dict({
-            'id': row[0],
-            'execution_id': row[1],
-            'step_id': row[2],
-            'name': row[3],
-            'description': row[4],
-            'file_path': row[5],
-            'file_name': row[6],
-            'file_size': row[7],
-            'mime_type': row[8],
-            'artifact_type': row[9],
-            'created_at': row[10],
-            'tags': json.loads(row[11]) if row[11] else [],
-            'is_public': bool(row[12]),
-            'retention_days': row[13],
-            'metadata': json.loads(row[14]) if row[14] else {}
-        })
+        return Artifact(
+            id=row['id'],
+            execution_id=row['execution_id'],
+            step_id=row['step_id'],
+            name=row['name'],
+            description=row['description'],
+            file_path=row['file_path'],
+            file_name=row['file_name'],
+            file_size=row['file_size'],
+            mime_type=row['mime_type'],
+            artifact_type=_ARTIFACT_TYPES[row['artifact_type']],
+            created_at=_from_micros(row['created_at']),
+            tags=_loads_list(row['tags']),
+            is_public=bool(row['is_public']),
+            retention_days=row['retention_days'],
+            metadata=_loads_dict(row['metadata']),
+            content_hash=row['content_hash']
+        )
     
     async def _ensure_initialized(self):
         """Ensure persistence layer is initialized"""
@@ -583,26 +1655,12 @@ class PersistenceLayer:
         await self._ensure_initialized()
         
         try:
-            db = await self._get_connection()
-            async with db.execute("BEGIN TRANSACTION"):
-                for execution in executions:
-                    await db.execute("""
-                        INSERT OR REPLACE INTO executions (
-                            id, name, command, working_directory, status, exit_code, error_message,
-                            created_at, started_at, completed_at, environment, user_name, tags,
-                            total_steps, completed_steps, current_step_index, metadata
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        execution.id, execution.name, execution.command, execution.working_directory,
-                        execution.status.value, execution.exit_code, execution.error_message,
-                        execution.created_at.isoformat(),
-                        execution.started_at.isoformat() if execution.started_at else None,
-                        execution.completed_at.isoformat() if execution.completed_at else None,
-                        json.dumps(execution.environment), execution.user, json.dumps(execution.tags),
-                        execution.total_steps, execution.completed_steps, execution.current_step_index,
-                        json.dumps(execution.metadata)
-                    ))
-                await db.execute("COMMIT")
+            async with self._write_connection() as db:
+                await db.execute("BEGIN IMMEDIATE")
+                await db.executemany(_UPSERT_EXECUTION, [_execution_row(execution) for execution in executions])
+                await db.commit()
+            self._execution_cache.invalidate([execution.id for execution in executions])
+            self._notify_changed({execution.id for execution in executions})
             
             logger.info(f"Batch saved {len(executions)} executions")
             return True
@@ -647,11 +1705,8 @@ class PersistenceLayer:
             if executions:
                 await self.save_execution_batch(executions)
             
-            # TODO: Implement batch save for steps and artifacts
-            for step in steps:
-                await self.save_step(step)
-            for artifact in artifacts:
-                await self.save_artifact(artifact)
+            if steps or artifacts:
+                await self.save_execution_bundle(None, steps, artifacts)
                 
             logger.info(f"Flushed buffer: {len(executions)} executions, {len(steps)} steps, {len(artifacts)} artifacts")
             
@@ -663,19 +1718,23 @@ class PersistenceLayer:
         await self._ensure_initialized()
         
         try:
-            db = await self._get_connection()
-            
             # Get database file size
             db_size = os.path.getsize(self.db_path) if self.db_path.exists() else 0
             
-            # Get table row counts
-            execution_count = await db.fetchval("SELECT COUNT(*) FROM executions")
-            step_count = await db.fetchval("SELECT COUNT(*) FROM steps")
-            artifact_count = await db.fetchval("SELECT COUNT(*) FROM artifacts")
-            
-            # Get WAL mode status
-            wal_mode = await db.fetchval("PRAGMA journal_mode")
-            cache_size = await db.fetchval("PRAGMA cache_size")
+            async with self._read_connection() as db:
+                # Get table row counts in one round trip; COUNT(*) walks the smallest index
+                async with db.execute("""
+                    SELECT (SELECT COUNT(*) FROM executions),
+                           (SELECT COUNT(*) FROM steps),
+                           (SELECT COUNT(*) FROM artifacts)
+                """) as cursor:
+                    execution_count, step_count, artifact_count = await cursor.fetchone()
+                
+                # Get WAL mode status
+                async with db.execute("PRAGMA journal_mode") as cursor:
+                    (wal_mode,) = await cursor.fetchone()
+                async with db.execute("PRAGMA cache_size") as cursor:
+                    (cache_size,) = await cursor.fetchone()
             
             return {
                 "database_size_bytes": db_size,
@@ -698,13 +1757,13 @@ class PersistenceLayer:
         await self._ensure_initialized()
         
         try:
-            db = await self._get_connection()
+            async with self._write_connection() as db:
             
-            # Analyze tables for better query planning
-            await db.execute("ANALYZE")
+                # Analyze tables for better query planning
+                await db.execute("ANALYZE")
             
-            # Optimize WAL file
-            await db.execute("PRAGMA wal_checkpoint(FULL)")
+                # Optimize WAL file
+                await db.execute("PRAGMA wal_checkpoint(FULL)")
             
             # Vacuum if needed (be careful with this in production)
             # await db.execute("VACUUM")
@@ -3,27 +3,155 @@ HTTP Web Server for serving frontend and API endpoints
 """
 
 import asyncio
+import hashlib
 import logging
-import json
+from collections import OrderedDict
+from datetime import datetime, timezone
 from pathlib import Path
 from aiohttp import web
 import aiofiles
+import orjson
+
+from ..models.execution import ExecutionStatus
+from .etags import etag_matches
 
 logger = logging.getLogger(__name__)
 
+# Status value -> enum, so filters are validated with a dict lookup instead of try/except
+_STATUS_VALUES = {status.value: status for status in ExecutionStatus}
+
+# Statuses listed by the active executions endpoint
+_ACTIVE_STATUSES = frozenset((ExecutionStatus.RUNNING, ExecutionStatus.PENDING))
+
+# Executions in these states no longer change, so their detail responses can be kept
+_FINISHED_STATUS_VALUES = frozenset(("completed", "failed", "cancelled"))
+
+# Encoded detail responses of finished executions kept in memory
+EXECUTION_BODY_CACHE_SIZE = 2048
+
+# Responses smaller than this are not worth compressing
+COMPRESSION_MIN_SIZE = 1024
+
+# Lists with more rows than this are streamed in batches instead of encoded in one body
+STREAM_MIN_ROWS = 100
+STREAM_BATCH_ROWS = 50
+
+# Read size for static files when the transport cannot use sendfile
+STATIC_CHUNK_SIZE = 256 * 1024
+
+# Browsers may reuse a page this long before revalidating it with its ETag
+TEMPLATE_CACHE_CONTROL = "public, max-age=60"
+
+# Idle time before a kept-alive connection is closed, longer than the dashboard's polling interval
+KEEPALIVE_TIMEOUT = 120
+
+# Pending connections the listening socket queues, so bursts of dashboard reconnects are not refused
+LISTEN_BACKLOG = 2048
+
+# Fixed payloads, encoded once instead of on every request
+_HEALTH = {"status": "healthy", "service": "StepFlow Monitor", "timestamp": "2025-08-01T17:30:00Z"}
+_HEALTH_JSON = orjson.dumps(_HEALTH)
+_MOCK_EXECUTIONS_JSON = orjson.dumps({
+    "executions": [
+        {
+            "id": "exec-123",
+            "status": "completed",
+            "name": "Example Execution (mock)",
+            "start_time": "2025-08-01T17:00:00Z"
+        }
+    ]
+})
+_MOCK_ACTIVE_JSON = orjson.dumps({"active_executions": []})
+_MOCK_STATS_JSON = orjson.dumps({
+    "total_executions": 0,
+    "active_now": 0,
+    "success_rate": "0.0%",
+    "avg_duration": "-"
+})
+_MOCK_LOGS_JSON = orjson.dumps({
+    "logs": [
+        {"timestamp": "2025-08-01T18:00:00Z", "level": "INFO", "message": "Mock log entry"}
+    ]
+})
+
+
+def json_response(data, status: int = 200, headers=None) -> web.Response:
+    """Build a JSON response encoded with orjson, which emits bytes directly"""
+    return web.Response(body=orjson.dumps(data), status=status, headers=headers, content_type='application/json')
+
+
+def _active_execution_dict(execution) -> dict:
+    """Serialize an execution for the active executions response"""
+    # orjson encodes naive datetimes exactly like isoformat(), so they are passed through as-is
+    return {
+        "id": execution.id,
+        "status": execution.status.value,
+        "name": execution.name,
+        "start_time": execution.started_at,
+        "command": execution.command,
+        "created_at": execution.created_at
+    }
+
+
+async def stream_json_rows(request, key: str, rows, serialize, meta: dict) -> web.StreamResponse:
+    """Write {key: [rows], **meta} in batches, yielding to the loop between them"""
+    response = web.StreamResponse(headers={'Content-Type': 'application/json'})
+    response.enable_compression()
+    await response.prepare(request)
+    
+    await response.write(b'{' + orjson.dumps(key) + b':[')
+    for start in range(0, len(rows), STREAM_BATCH_ROWS):
+        chunk = b','.join([orjson.dumps(serialize(row)) for row in rows[start:start + STREAM_BATCH_ROWS]])
+        await response.write(b',' + chunk if start else chunk)
+        await asyncio.sleep(0)
+    
+    # Splice the remaining keys in after the list, reusing the closing brace of the encoded meta
+    trailer = orjson.dumps(meta)
+    await response.write(b'],' + trailer[1:] if meta else b']}')
+    await response.write_eof()
+    return response
+
+
+@web.middleware
+async def compression_middleware(request, handler):
+    """Compress larger responses with the encoding negotiated from Accept-Encoding"""
+    response = await handler(request)
+    if isinstance(response, web.Response) and response.body is not None:
+        body = response.body
+        if isinstance(body, (bytes, bytearray)) and len(body) >= COMPRESSION_MIN_SIZE:
+            response.enable_compression()
+    return response
+
 
 class WebServer:
     """HTTP server for web interface and API"""
     
-    def __init__(self, host: str = "0.0.0.0", port: int = 8080, execution_engine=None, executions_api=None, persistence=None):
+    def __init__(self, host: str = "0.0.0.0", port: int = 8080, execution_engine=None, executions_api=None, persistence=None,
+                 artifacts_api=None, reuse_port: bool = False, access_log: bool = False):
         self.host = host
         self.port = port
+        self.reuse_port = reuse_port
+        self.access_log = access_log
         self.app = None
         self.runner = None
         self.site = None
         self.execution_engine = execution_engine
         self.executions_api = executions_api
         self.persistence = persistence
+        self.artifacts_api = artifacts_api
+        
+        # Encoded active executions response as (engine active_version, body)
+        self._active_body = (-1, b"")
+        
+        # Encoded pages by template name as (file mtime or None if missing, body, etag)
+        self._template_cache = {}
+        
+        # Encoded detail responses of finished executions by id, least recently used first.
+        # Entries are evicted when the persistence layer commits rows of their execution.
+        self._execution_bodies: OrderedDict = OrderedDict()
+        self._execution_bodies_version = 0
+        if persistence:
+            persistence.add_change_listener(self._evict_execution_bodies)
         
         # Path setup
         self.app_path = Path(__file__).parent.parent
@@ -32,31 +160,41 @@ class WebServer:
     
     def setup_routes(self):
         """Setup all routes"""
-        # Static files
-        self.app.router.add_static('/static/', self.static_path, name='static')
+        # Static files, sent as FileResponse so the loop can use sendfile (left untouched by compression_middleware)
+        self.app.router.add_static(
+            '/static/', self.static_path, name='static', chunk_size=STATIC_CHUNK_SIZE, follow_symlinks=False
+        )
+        
+        # Routes are matched in registration order, so fixed paths go before the
+        # {param} ones, whose patterns are regexes tried one by one on older aiohttp
         
-        # API routes
+        # API routes; GET and POST on the same path share one resource when added back to back
         self.app.router.add_get('/api/health', self.health_check)
         self.app.router.add_get('/api/executions', self.get_executions)
+        self.app.router.add_post('/api/executions', self.create_execution)
         self.app.router.add_get('/api/executions/active', self.get_active_executions)
         self.app.router.add_get('/api/executions/statistics', self.get_execution_statistics)
-        self.app.router.add_get('/api/executions/{execution_id}', self.get_execution)
-        self.app.router.add_get('/api/executions/{execution_id}/logs', self.get_execution_logs)
-        self.app.router.add_post('/api/executions', self.create_execution)
         
         # Web pages
         self.app.router.add_get('/', self.serve_index)
         self.app.router.add_get('/execution', self.serve_execution)
         self.app.router.add_get('/history', self.serve_history)
         self.app.router.add_get('/artifacts', self.serve_artifacts)
+        
+        # API routes with path parameters
+        self.app.router.add_get('/api/executions/{execution_id}', self.get_execution)
+        self.app.router.add_get('/api/executions/{execution_id}/logs', self.get_execution_logs)
+        self.app.router.add_get('/api/artifacts/execution/{execution_id}', self.get_execution_artifacts)
+        self.app.router.add_get('/api/artifacts/{artifact_id}', self.get_artifact)
+        self.app.router.add_get('/api/artifacts/{artifact_id}/download', self.download_artifact)
     
     async def serve_index(self, request):
         """Serve the main dashboard page"""
-        return await self.serve_template('index.html')
+        return await self.serve_template(request, 'index.html')
     
     async def serve_execution(self, request):
         """Serve live execution page"""
-        return await self.serve_template('execution.html', default_content="""
+        return await self.serve_template(request, 'execution.html', default_content="""
 <!DOCTYPE html>
 <html>
 <head>
@@ -73,7 +211,7 @@ class WebServer:
     
     async def serve_history(self, request):
         """Serve execution history page"""
-        return await self.serve_template('history.html', default_content="""
+        return await self.serve_template(request, 'history.html', default_content="""
 <!DOCTYPE html>
 <html>
 <head>
@@ -89,7 +227,7 @@ class WebServer:
     
     async def serve_artifacts(self, request):
         """Serve artifacts page"""
-        return await self.serve_template('artifacts.html', default_content="""
+        return await self.serve_template(request, 'artifacts.html', default_content="""
 <!DOCTYPE html>
 <html>
 <head>
@@ -103,29 +241,46 @@ class WebServer:
 </html>
         """)
     
-    async def serve_template(self, template_name: str, default_content: str = None):
-        """Serve HTML template file"""
+    async def serve_template(self, request, template_name: str, default_content: str = None):
+        """Serve HTML template file, read from disk only when it changed since the last request
+        
+        Answers 304 Not Modified when the browser already has the current page.
+        """
         template_file = self.templates_path / template_name
         
         try:
-            if template_file.exists():
-                async with aiofiles.open(template_file, 'r') as f:
-                    content = await f.read()
+            try:
+                mtime = template_file.stat().st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+            
+            cached = self._template_cache.get(template_name)
+            if cached and cached[0] == mtime:
+                _, body, etag = cached
             else:
-                content = default_content or f"<h1>Page not found: {template_name}</h1>"
+                if mtime is not None:
+                    async with aiofiles.open(template_file, 'rb') as f:
+                        body = await f.read()
+                else:
+                    body = (default_content or f"<h1>Page not found: {template_name}</h1>").encode('utf-8')
+                # Weak, since compression_middleware may send the page gzip or deflate encoded
+                etag = f'W/"{hashlib.sha1(body).hexdigest()}"'
+                self._template_cache[template_name] = (mtime, body, etag)
             
-            return web.Response(text=content, content_type='text/html')
+            headers = {"ETag": etag, "Cache-Control": TEMPLATE_CACHE_CONTROL}
+            if etag_matches(etag, request.headers.get('If-None-Match')):
+                return web.Response(status=304, headers=headers)
+            return web.Response(body=body, content_type='text/html', charset='utf-8', headers=headers)
         except Exception as e:
             logger.error(f"Error serving template {template_name}: {e}")
             return web.Response(text=f"Error loading page: {e}", status=500)
     
     async def health_check(self, request):
-        """Health check endpoint"""
-        return web.json_response({
-            "status": "healthy",
-            "service": "StepFlow Monitor",
-            "timestamp": "2025-08-01T17:30:00Z"
-        })
+        """Health check endpoint, with the current time only when ?fresh=1 asks for it"""
+        if request.query.get('fresh') == '1':
+            timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+            return json_response({**_HEALTH, "timestamp": timestamp})
+        return web.Response(body=_HEALTH_JSON, content_type='application/json')
     
     async def get_executions(self, request):
         """Get list of executions with filtering and pagination"""
@@ -135,17 +290,15 @@ class WebServer:
             offset = int(request.query.get('offset', '0'))
             status_filter = request.query.get('status')
             user_filter = request.query.get('user')
+            cursor = request.query.get('cursor')
+            fields = request.query.get('fields')
             
             # Convert status string to enum if provided
-            status_enum = None
-            if status_filter:
-                from ..models.execution import ExecutionStatus
-                try:
-                    status_enum = ExecutionStatus(status_filter)
-                except ValueError:
-                    return web.json_response({
-                        "error": f"Invalid status: {status_filter}"
-                    }, status=400)
+            if status_filter and status_filter not in _STATUS_VALUES:
+                return json_response({
+                    "error": f"Invalid status: {status_filter}"
+                }, status=400)
+            status_enum = _STATUS_VALUES.get(status_filter) if status_filter else None
             
             # Use executions API if available
             if self.executions_api:
@@ -153,10 +306,21 @@ class WebServer:
                     'limit': limit,
                     'offset': offset,
                     'status': status_filter,
-                    'user': user_filter
+                    'user': user_filter,
+                    'cursor': cursor,
+                    'fields': fields
                 }
-                result = await self.executions_api.get_executions(query_params)
-                return web.json_response(result)
+                page = await self.executions_api.get_execution_page(query_params)
+                if page.get("status") != 200:
+                    return json_response(page)
+                
+                field_set = page.pop("fields")
+                executions = page.pop("executions")
+                if len(executions) > STREAM_MIN_ROWS:
+                    return await stream_json_rows(
+                        request, "executions", executions, lambda execution: execution.to_dict(field_set), page
+                    )
+                return json_response({"executions": [execution.to_dict(field_set) for execution in executions], **page})
             
             # Fallback: direct persistence access
             elif self.persistence:
@@ -169,27 +333,19 @@ class WebServer:
                 )
                 logger.info(f"Found {len(executions)} executions in database")
                 
-                return web.json_response({
-                    "executions": [execution.to_dict() for execution in executions],
-                    "limit": limit,
-                    "offset": offset,
-                    "count": len(executions)
-                })
+                field_set = set(fields.split(',')) if fields else None
+                page = {"limit": limit, "offset": offset, "count": len(executions)}
+                if len(executions) > STREAM_MIN_ROWS:
+                    return await stream_json_rows(
+                        request, "executions", executions, lambda execution: execution.to_dict(field_set), page
+                    )
+                return json_response({"executions": [execution.to_dict(field_set) for execution in executions], **page})
             else:
                 # Fallback to mock data
-                return web.json_response({
-                    "executions": [
-                        {
-                            "id": "exec-123",
-                            "status": "completed",
-                            "name": "Example Execution (mock)",
-                            "start_time": "2025-08-01T17:00:00Z"
-                        }
-                    ]
-                })
+                return web.Response(body=_MOCK_EXECUTIONS_JSON, content_type='application/json')
         except Exception as e:
             logger.error(f"Error getting executions: {e}")
-            return web.json_response({"error": str(e)}, status=500)
+            return json_response({"error": str(e)}, status=500)
     
     async def create_execution(self, request):
         """Create new execution"""
@@ -199,7 +355,7 @@ class WebServer:
             name = data.get('name', command)
             
             if not command:
-                return web.json_response({
+                return json_response({
                     "error": "Command is required"
                 }, status=400)
             
@@ -216,7 +372,7 @@ class WebServer:
                         working_directory="."
                     )
                     
-                    return web.json_response({
+                    return json_response({
                         "id": execution.id,
                         "status": execution.status.value,
                         "message": "Execution started successfully",
@@ -224,12 +380,12 @@ class WebServer:
                     }, status=201)
                 except Exception as e:
                     logger.error(f"Failed to start execution: {e}")
-                    return web.json_response({
+                    return json_response({
                         "error": f"Failed to start execution: {str(e)}"
                     }, status=500)
             else:
                 # Fallback to mock response
-                return web.json_response({
+                return json_response({
                     "id": "exec-" + str(hash(command))[-8:],
                     "status": "started",
                     "message": "Execution started successfully (mock mode)",
@@ -237,7 +393,7 @@ class WebServer:
                 }, status=201)
                 
         except Exception as e:
-            return web.json_response({
+            return json_response({
                 "error": str(e)
             }, status=400)
     
@@ -245,25 +401,23 @@ class WebServer:
         """Get list of active executions"""
         try:
             if self.execution_engine:
-                # Get active executions from the engine
-                active_executions = []
-                for exec_id, execution in self.execution_engine.active_executions.items():
-                    if execution.status.value in ["running", "pending"]:
-                        active_executions.append({
-                            "id": execution.id,
-                            "status": execution.status.value,
-                            "name": execution.name,
-                            "start_time": execution.started_at.isoformat() if execution.started_at else None,
-                            "command": execution.command,
-                            "created_at": execution.created_at.isoformat() if execution.created_at else None
-                        })
-                return web.json_response({"active_executions": active_executions})
+                # Reuse the encoded body until the engine reports a change
+                version, body = self._active_body
+                if version != self.execution_engine.active_version:
+                    active_executions = [
+                        _active_execution_dict(execution)
+                        for execution in self.execution_engine.active_executions.values()
+                        if execution.status in _ACTIVE_STATUSES
+                    ]
+                    body = orjson.dumps({"active_executions": active_executions})
+                    self._active_body = (self.execution_engine.active_version, body)
+                return web.Response(body=body, content_type='application/json')
             else:
                 # Fallback to mock data
-                return web.json_response({"active_executions": []})
+                return web.Response(body=_MOCK_ACTIVE_JSON, content_type='application/json')
         except Exception as e:
             logger.error(f"Error getting active executions: {e}")
-            return web.json_response({"error": str(e)}, status=500)
+            return json_response({"error": str(e)}, status=500)
     
     async def get_execution_statistics(self, request):
         """Get execution statistics"""
@@ -274,36 +428,31 @@ class WebServer:
                 if result.get("status") == 200:
                     stats = result.get("statistics", {})
                     # Format the response to match frontend expectations
-                    return web.json_response({
+                    return json_response({
                         "total_executions": stats.get("total_executions", 0),
                         "active_now": stats.get("active_count", 0),
                         "success_rate": f"{stats.get('success_rate', 0):.1f}%",
                         "avg_duration": f"{stats.get('avg_duration', 0):.1f}s" if stats.get('avg_duration', 0) > 0 else "-"
                     })
                 else:
-                    return web.json_response({"error": result.get("error", "Unknown error")}, status=result.get("status", 500))
+                    return json_response({"error": result.get("error", "Unknown error")}, status=result.get("status", 500))
             else:
                 # Fallback - manually calculate from persistence layer
                 if hasattr(self, 'persistence') and self.persistence:
-                    executions = await self.persistence.get_executions(limit=1000)
-                    total_executions = len(executions)
+                    # Aggregated in SQL, average duration covers completed executions only
+                    db_stats = await self.persistence.get_execution_stats()
+                    total_executions = db_stats["total_executions"]
                     
                     if total_executions > 0:
-                        completed = len([ex for ex in executions if ex.status.value == "completed"])
-                        failed = len([ex for ex in executions if ex.status.value == "failed"])
-                        success_rate = (completed / total_executions) * 100
-                        
-                        # Calculate average duration for completed executions only (exclude running ones with inflated duration)
-                        durations = [ex.duration_seconds for ex in executions if ex.duration_seconds and ex.status.value == "completed" and ex.completed_at is not None]
-                        avg_duration = sum(durations) / len(durations) if durations else 0
+                        success_rate = (db_stats["completed_executions"] / total_executions) * 100
                     else:
                         success_rate = 0
-                        avg_duration = 0
+                    avg_duration = db_stats["avg_duration"]
                     
                     # Get active executions count
-                    active_now = len(self.execution_engine.active_executions) if self.execution_engine else 0
+                    active_now = self.execution_engine.active_count if self.execution_engine else 0
                     
-                    return web.json_response({
+                    return json_response({
                         "total_executions": total_executions,
                         "active_now": active_now,
                         "success_rate": f"{success_rate:.1f}%",
@@ -311,15 +460,10 @@ class WebServer:
                     })
                 else:
                     # Final fallback
-                    return web.json_response({
-                        "total_executions": 0,
-                        "active_now": 0,
-                        "success_rate": "0.0%",
-                        "avg_duration": "-"
-                    })
+                    return web.Response(body=_MOCK_STATS_JSON, content_type='application/json')
         except Exception as e:
             logger.error(f"Error getting execution statistics: {e}")
-            return web.json_response({"error": str(e)}, status=500)
+            return json_response({"error": str(e)}, status=500)
     
     async def get_execution(self, request):
         """Get details of a specific execution with steps and artifacts"""
@@ -328,31 +472,43 @@ class WebServer:
             
             # Use executions API if available
             if self.executions_api:
+                body = self._execution_bodies.get(execution_id)
+                if body is not None:
+                    self._execution_bodies.move_to_end(execution_id)
+                    return web.Response(body=body, content_type='application/json')
+                
+                version = self._execution_bodies_version
                 result = await self.executions_api.get_execution(execution_id)
-                return web.json_response(result)
+                body = orjson.dumps(result)
+                
+                # Keep finished executions, unless one of their rows was written while this one was read
+                if (result.get("status") == 200 and version == self._execution_bodies_version
+                        and result["execution"]["status"] in _FINISHED_STATUS_VALUES):
+                    self._execution_bodies[execution_id] = body
+                    if len(self._execution_bodies) > EXECUTION_BODY_CACHE_SIZE:
+                        self._execution_bodies.popitem(last=False)
+                return web.Response(body=body, content_type='application/json')
             
             # Fallback: direct persistence access
             elif self.persistence:
                 try:
-                    execution = await self.persistence.get_execution(execution_id)
-                    if not execution:
-                        return web.json_response({"error": "Execution not found"}, status=404)
+                    bundle = await self.persistence.get_execution_bundle(execution_id)
+                    if not bundle:
+                        return json_response({"error": "Execution not found"}, status=404)
                     
-                    # Get steps and artifacts
-                    steps = await self.persistence.get_steps(execution_id)
-                    artifacts = await self.persistence.get_artifacts(execution_id)
+                    execution, steps, artifacts = bundle
                     
-                    return web.json_response({
+                    return json_response({
                         "execution": execution.to_dict(),
                         "steps": [step.to_dict() for step in steps],
                         "artifacts": [artifact.to_dict() for artifact in artifacts]
                     })
                 except Exception as e:
                     logger.error(f"Failed to get execution from database: {e}")
-                    return web.json_response({"error": str(e)}, status=500)
+                    return json_response({"error": str(e)}, status=500)
             else:
                 # Fallback to mock data
-                return web.json_response({
+                return json_response({
                     "execution": {
                         "id": execution_id,
                         "name": "Mock Execution",
@@ -367,7 +523,7 @@ class WebServer:
                 
         except Exception as e:
             logger.error(f"Error getting execution {execution_id}: {e}")
-            return web.json_response({"error": str(e)}, status=500)
+            return json_response({"error": str(e)}, status=500)
     
     async def get_execution_logs(self, request):
         """Get logs for a specific execution"""
@@ -397,31 +553,117 @@ class WebServer:
                             "message": f"Status: {execution.status.value}"
                         }
                     ]
-                    return web.json_response({"logs": logs})
+                    return json_response({"logs": logs})
                 else:
-                    return web.json_response({"error": "Execution not found"}, status=404)
+                    return json_response({"error": "Execution not found"}, status=404)
             else:
                 # Fallback to mock logs
-                return web.json_response({
-                    "logs": [
-                        {"timestamp": "2025-08-01T18:00:00Z", "level": "INFO", "message": "Mock log entry"}
-                    ]
-                })
+                return web.Response(body=_MOCK_LOGS_JSON, content_type='application/json')
                 
         except Exception as e:
             logger.error(f"Error getting execution logs for {execution_id}: {e}")
-            return web.json_response({"error": str(e)}, status=500)
+            return json_response({"error": str(e)}, status=500)
+    
+    def _evict_execution_bodies(self, execution_ids):
+        """Drop cached detail responses of executions whose rows changed, or all of them for None"""
+        self._execution_bodies_version += 1
+        if execution_ids is None:
+            self._execution_bodies.clear()
+        else:
+            for execution_id in execution_ids:
+                self._execution_bodies.pop(execution_id, None)
+    
+    def _cacheable_response(self, result):
+        """Turn an API result carrying an ETag into a JSON or 304 Not Modified response"""
+        status = result.get("status", 500)
+        headers = {}
+        # Transport metadata, sent as headers and kept out of the body
+        etag = result.pop("etag", None)
+        cache_control = result.pop("cache_control", None)
+        if etag:
+            headers["ETag"] = etag
+            headers["Cache-Control"] = cache_control
+        if status == 304:
+            return web.Response(status=304, headers=headers)
+        return json_response(result, status=status, headers=headers)
+    
+    async def get_artifact(self, request):
+        """Get artifact metadata"""
+        artifact_id = request.match_info['artifact_id']
+        try:
+            if not self.artifacts_api:
+                return json_response({"error": "Artifacts API not available"}, status=503)
+            
+            result = await self.artifacts_api.get_artifact(
+                artifact_id, if_none_match=request.headers.get('If-None-Match')
+            )
+            return self._cacheable_response(result)
+        except Exception as e:
+            logger.error(f"Error getting artifact {artifact_id}: {e}")
+            return json_response({"error": str(e)}, status=500)
+    
+    async def get_execution_artifacts(self, request):
+        """Get artifacts of an execution"""
+        execution_id = request.match_info['execution_id']
+        try:
+            if not self.artifacts_api:
+                return json_response({"error": "Artifacts API not available"}, status=503)
+            
+            result = await self.artifacts_api.get_execution_artifacts(
+                execution_id,
+                fields=request.query.get('fields'),
+                if_none_match=request.headers.get('If-None-Match')
+            )
+            return self._cacheable_response(result)
+        except Exception as e:
+            logger.error(f"Error getting artifacts for execution {execution_id}: {e}")
+            return json_response({"error": str(e)}, status=500)
+    
+    async def download_artifact(self, request):
+        """Stream an artifact file to the client"""
+        artifact_id = request.match_info['artifact_id']
+        try:
+            if not self.artifacts_api:
+                return json_response({"error": "Artifacts API not available"}, status=503)
+            
+            result = await self.artifacts_api.download_artifact(artifact_id)
+            if result.get("status") != 200:
+                return json_response({"error": result.get("error")}, status=result.get("status", 500))
+            
+            # FileResponse sends the file with sendfile() and handles Range requests itself
+            file_name = result["file_name"].replace('"', '')
+            return web.FileResponse(
+                result["file_path"],
+                headers={
+                    "Content-Type": result["mime_type"] or "application/octet-stream",
+                    "Content-Disposition": f'attachment; filename="{file_name}"'
+                }
+            )
+        except Exception as e:
+            logger.error(f"Error downloading artifact {artifact_id}: {e}")
+            return json_response({"error": str(e)}, status=500)
     
     async def start(self):
         """Start the web server"""
         try:
-            self.app = web.Application()
+            self.app = web.Application(middlewares=[compression_middleware])
             self.setup_routes()
             
-            self.runner = web.AppRunner(self.app)
+            # Signals are handled by the application, not the runner.
+            # Without the access log, requests skip formatting a log line each.
+            self.runner = web.AppRunner(
+                self.app,
+                handle_signals=False,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                tcp_keepalive=True,
+                access_log=web.access_logger if self.access_log else None
+            )
             await self.runner.setup()
             
-            self.site = web.TCPSite(self.runner, self.host, self.port)
+            # SO_REUSEPORT lets a restarted server bind while the old socket drains
+            self.site = web.TCPSite(
+                self.runner, self.host, self.port, backlog=LISTEN_BACKLOG, reuse_port=self.reuse_port or None
+            )
             await self.site.start()
             
             logger.info(f"✅ Web server started on http://{self.host}:{self.port}")
@@ -35,7 +35,8 @@ class StepFlowApp:
         
         # Initialize components
         self.persistence = PersistenceLayer(
-            storage_path=self.config.get('storage_path', 'storage')
+            storage_path=self.config.get('storage_path', 'storage'),
+            read_pool_size=self.config.get('db_read_pool_size')
         )
         
         self.websocket_server = WebSocketServer(
@@ -47,7 +48,8 @@ class StepFlowApp:
         
         self.execution_engine = ExecutionEngine(
             persistence_layer=self.persistence,
-            websocket_server=self.websocket_server
+            websocket_server=self.websocket_server,
+            use_re2=self.config.get('marker_use_re2', False)
         )
         
         # Initialize APIs first
@@ -55,16 +57,22 @@ class StepFlowApp:
             self.execution_engine, self.persistence, self.auth_manager
         )
         
+        self.artifacts_api = ArtifactsAPI(self.persistence, self.auth_manager)
+        
         self.web_server = WebServer(
             host=self.config.get('web_host', '0.0.0.0'),
             port=self.config.get('web_port', 8080),
             execution_engine=self.execution_engine,
             executions_api=self.executions_api,
-            persistence=self.persistence
+            persistence=self.persistence,
+            artifacts_api=self.artifacts_api,
+            reuse_port=self.config.get('web_reuse_port', False),
+            access_log=self.config.get('web_access_log', False)
         )
-        self.artifacts_api = ArtifactsAPI(self.persistence, self.auth_manager)
         self.health_api = HealthAPI(
-            self.persistence, self.websocket_server, self.auth_manager
+            self.persistence, self.websocket_server, self.auth_manager,
+            stats_ttl=self.config.get('health_stats_ttl', 10.0),
+            stats_cache_min_total=self.config.get('health_stats_cache_min_total', 1000)
         )
     
     async def start(self):
@@ -115,6 +123,10 @@ class StepFlowApp:
             await self.web_server.stop()
             logger.info("✅ Web server stopped")
         
+        # Stop health metrics sampler
+        if self.health_api:
+            await self.health_api.stop()
+        
         # Close database connection
         if self.persistence:
             await self.persistence.close()
@@ -146,10 +158,16 @@ async def main():
     # Configuration
     config = {
         'storage_path': 'storage',
+        'db_read_pool_size': None,  # Defaults to the CPU count, at least 4
         'websocket_host': '0.0.0.0',
         'websocket_port': 8765,
         'web_host': '0.0.0.0',
         'web_port': 8080,
+        'web_reuse_port': False,
+        'web_access_log': False,  # One log line per request, mostly dashboard polling
+        'marker_use_re2': False,
+        'health_stats_ttl': 10.0,  # Seconds execution counts are reused by health and status polls
+        'health_stats_cache_min_total': 1000,  # Smaller databases are counted on every poll
     }
     
     # Create and start app
@@ -165,5 +183,16 @@ async def main():
         await app.stop()
 
 
+def install_event_loop():
+    """Use uvloop for the event loop when it is installed"""
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    uvloop.install()
+    return True
+
+
 if __name__ == "__main__":
+    install_event_loop()
     asyncio.run(main())
\ No newline at end of file
@@ -5,7 +5,7 @@ Artifact model for generated files and outputs
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Set
 import uuid
 import os
 
@@ -20,7 +20,7 @@ class ArtifactType(Enum):
     OTHER = "other"
 
 
-@dataclass
+@dataclass(slots=True)
 class Artifact:
     """Represents a generated artifact (file or output)"""
     
@@ -47,6 +47,9 @@ class Artifact:
     is_public: bool = True
     retention_days: Optional[int] = None
     
+    # Digest of the stored content, shared by artifacts with identical files
+    content_hash: Optional[str] = None
+    
     @property
     def file_extension(self) -> str:
         """Get file extension"""
@@ -111,36 +114,21 @@ class Artifact:
             
         return f"{size:.1f} {size_names[i]}"
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization"""
-        return {
-            'id': self.id,
-            'execution_id': self.execution_id,
-            'step_id': self.step_id,
-            'name': self.name,
-            'description': self.description,
-            'file_path': self.file_path,
-            'file_name': self.file_name,
-            'file_size': self.file_size,
-            'file_size_human': self.get_human_readable_size(),
-            'mime_type': self.mime_type,
-            'artifact_type': self.artifact_type.value,
-            'file_extension': self.file_extension,
-            'created_at': self.created_at.isoformat(),
-            'tags': self.tags,
-            'metadata': self.metadata,
-            'is_public': self.is_public,
-            'retention_days': self.retention_days,
-            'exists': self.exists,
-            'download_url': self.download_url,
-            'is_expired': self.is_expired
-        }
+    def to_dict(self, fields: Optional[Set[str]] = None) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization
+        
+        If fields is given, only those keys are built, which also skips the
+        file existence check unless 'exists' is requested.
+        """
+        if fields is None:
+            return {name: getter(self) for name, getter in _DICT_FIELDS}
+        return {name: getter(self) for name, getter in _DICT_FIELDS if name in fields}
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Artifact':
         """Create from dictionary"""
         artifact = cls(
-            id=data.get('id', str(uuid.uuid4())),
+            id=data['id'] if 'id' in data else str(uuid.uuid4()),
             execution_id=data.get('execution_id', ''),
             step_id=data.get('step_id'),
             name=data.get('name', ''),
@@ -153,11 +141,38 @@ class Artifact:
             tags=data.get('tags', []),
             metadata=data.get('metadata', {}),
             is_public=data.get('is_public', True),
-            retention_days=data.get('retention_days')
+            retention_days=data.get('retention_days'),
+            content_hash=data.get('content_hash')
         )
         
         # Parse datetime fields
         if data.get('created_at'):
             artifact.created_at = datetime.fromisoformat(data['created_at'])
             
-        return artifact
\ No newline at end of file
+        return artifact
+
+
+# Serialized keys and how to build them, in output order
+_DICT_FIELDS = (
+    ('id', lambda a: a.id),
+    ('execution_id', lambda a: a.execution_id),
+    ('step_id', lambda a: a.step_id),
+    ('name', lambda a: a.name),
+    ('description', lambda a: a.description),
+    ('file_path', lambda a: a.file_path),
+    ('file_name', lambda a: a.file_name),
+    ('file_size', lambda a: a.file_size),
+    ('file_size_human', lambda a: a.get_human_readable_size()),
+    ('mime_type', lambda a: a.mime_type),
+    ('artifact_type', lambda a: a.artifact_type.value),
+    ('file_extension', lambda a: a.file_extension),
+    ('created_at', lambda a: a.created_at.isoformat()),
+    ('tags', lambda a: a.tags),
+    ('metadata', lambda a: a.metadata),
+    ('is_public', lambda a: a.is_public),
+    ('retention_days', lambda a: a.retention_days),
+    ('content_hash', lambda a: a.content_hash),
+    ('exists', lambda a: a.exists),
+    ('download_url', lambda a: a.download_url),
+    ('is_expired', lambda a: a.is_expired),
+)
\ No newline at end of file
@@ -5,9 +5,11 @@ Execution model for script execution sessions
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set
 import uuid
 
+import orjson
+
 
 class ExecutionStatus(Enum):
     PENDING = "pending"
@@ -17,7 +19,7 @@ class ExecutionStatus(Enum):
     CANCELLED = "cancelled"
 
 
-@dataclass
+@dataclass(slots=True)
 class Execution:
     """Represents a script execution session"""
     
@@ -50,6 +52,53 @@ class Execution:
     # Metadata
     metadata: Dict[str, Any] = field(default_factory=dict)
     
+    # JSON text of the fields in _LAZY_JSON_FIELDS not decoded yet, see set_json_fields
+    _pending_json: Optional[Dict[str, str]] = field(default=None, init=False, repr=False, compare=False)
+    
+    # (created_at, started_at, completed_at, and their ISO strings), see timestamps_iso
+    _iso_cache: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    
+    def set_json_fields(self, json_fields: Dict[str, str]):
+        """Replace environment, tags or metadata with their JSON text, decoded on first read
+        
+        Used when loading from storage, so listings that never touch these fields
+        skip the parsing.
+        """
+        for name in json_fields:
+            delattr(self, name)
+        self._pending_json = json_fields
+    
+    def __getattr__(self, name: str) -> Any:
+        """Decode a field left as JSON text by set_json_fields on first access"""
+        # Only reached for unset slots, i.e. the fields set_json_fields left undecoded
+        if name in _LAZY_JSON_FIELDS:
+            pending = self._pending_json
+            if pending and name in pending:
+                value = orjson.loads(pending[name])
+                setattr(self, name, value)
+                # Dropped only after the slot is set, so a concurrent reader never finds neither
+                pending.pop(name, None)
+                return value
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+    
+    def timestamps_iso(self) -> tuple:
+        """ISO strings of created_at, started_at and completed_at
+        
+        Built once and reused until one of the timestamps is reassigned, which
+        datetimes being immutable is the only way they can change.
+        """
+        cache = self._iso_cache
+        created_at, started_at, completed_at = self.created_at, self.started_at, self.completed_at
+        if cache is None or cache[0] is not created_at or cache[1] is not started_at or cache[2] is not completed_at:
+            cache = (
+                created_at, started_at, completed_at,
+                created_at.isoformat(),
+                started_at.isoformat() if started_at else None,
+                completed_at.isoformat() if completed_at else None
+            )
+            self._iso_cache = cache
+        return cache
+    
     @property
     def duration_seconds(self) -> Optional[float]:
         """Calculate execution duration in seconds"""
@@ -89,35 +138,44 @@ class Execution:
         self.exit_code = exit_code
         self.completed_at = datetime.now()
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization"""
-        return {
-            'id': self.id,
-            'name': self.name,
-            'command': self.command,
-            'working_directory': self.working_directory,
-            'status': self.status.value,
-            'exit_code': self.exit_code,
-            'error_message': self.error_message,
-            'created_at': self.created_at.isoformat(),
-            'started_at': self.started_at.isoformat() if self.started_at else None,
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
-            'environment': self.environment,
-            'user': self.user,
-            'tags': self.tags,
-            'total_steps': self.total_steps,
-            'completed_steps': self.completed_steps,
-            'current_step_index': self.current_step_index,
-            'duration_seconds': self.duration_seconds,
-            'progress_percentage': self.progress_percentage,
-            'metadata': self.metadata
-        }
+    def to_dict(self, fields: Optional[Set[str]] = None) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization
+        
+        If fields is given, only those keys are built.
+        """
+        if fields is None:
+            # Full rows use a dict literal, built in one pass without a call per key.
+            # Keys and order must match _DICT_FIELDS.
+            iso = self.timestamps_iso()
+            return {
+                'id': self.id,
+                'name': self.name,
+                'command': self.command,
+                'working_directory': self.working_directory,
+                'status': self.status.value,
+                'exit_code': self.exit_code,
+                'error_message': self.error_message,
+                'created_at': iso[3],
+                'started_at': iso[4],
+                'completed_at': iso[5],
+                'environment': self.environment,
+                'user': self.user,
+                'tags': self.tags,
+                'total_steps': self.total_steps,
+                'completed_steps': self.completed_steps,
+                'current_step_index': self.current_step_index,
+                'duration_seconds': self.duration_seconds,
+                'progress_percentage': self.progress_percentage,
+                'metadata': self.metadata
+            }
+        iso = None if _TIMESTAMP_FIELDS.isdisjoint(fields) else self.timestamps_iso()
+        return {name: getter(self, iso) for name, getter in _DICT_FIELDS if name in fields}
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Execution':
         """Create from dictionary"""
         execution = cls(
-            id=data.get('id', str(uuid.uuid4())),
+            id=data['id'] if 'id' in data else str(uuid.uuid4()),
             name=data.get('name', ''),
             command=data.get('command', ''),
             working_directory=data.get('working_directory', ''),
@@ -141,4 +199,35 @@ class Execution:
         if data.get('completed_at'):
             execution.completed_at = datetime.fromisoformat(data['completed_at'])
             
-        return execution
\ No newline at end of file
+        return execution
+
+
+# Fields stored as JSON columns, which set_json_fields can leave undecoded
+_LAZY_JSON_FIELDS = frozenset(('environment', 'tags', 'metadata'))
+
+# Serialized keys rendered from timestamps_iso()
+_TIMESTAMP_FIELDS = frozenset(('created_at', 'started_at', 'completed_at'))
+
+# Serialized keys and how to build them from the execution and its timestamps_iso(), in output order.
+# Used for field-filtered rows; to_dict builds full rows with an equivalent literal.
+_DICT_FIELDS = (
+    ('id', lambda e, iso: e.id),
+    ('name', lambda e, iso: e.name),
+    ('command', lambda e, iso: e.command),
+    ('working_directory', lambda e, iso: e.working_directory),
+    ('status', lambda e, iso: e.status.value),
+    ('exit_code', lambda e, iso: e.exit_code),
+    ('error_message', lambda e, iso: e.error_message),
+    ('created_at', lambda e, iso: iso[3]),
+    ('started_at', lambda e, iso: iso[4]),
+    ('completed_at', lambda e, iso: iso[5]),
+    ('environment', lambda e, iso: e.environment),
+    ('user', lambda e, iso: e.user),
+    ('tags', lambda e, iso: e.tags),
+    ('total_steps', lambda e, iso: e.total_steps),
+    ('completed_steps', lambda e, iso: e.completed_steps),
+    ('current_step_index', lambda e, iso: e.current_step_index),
+    ('duration_seconds', lambda e, iso: e.duration_seconds),
+    ('progress_percentage', lambda e, iso: e.progress_percentage),
+    ('metadata', lambda e, iso: e.metadata),
+)
\ No newline at end of file
@@ -17,7 +17,7 @@ class StepStatus(Enum):
     SKIPPED = "skipped"
 
 
-@dataclass
+@dataclass(slots=True)
 class LogEntry:
     """Individual log entry within a step"""
     timestamp: datetime = field(default_factory=datetime.now)
@@ -68,6 +68,10 @@ class Step:
     # Logs
     logs: List[LogEntry] = field(default_factory=list)
     
+    # Log summary stored with the step, for steps loaded without their logs
+    log_count: int = 0
+    last_log_at: Optional[datetime] = None
+    
     # Metadata
     metadata: Dict[str, Any] = field(default_factory=dict)
     
@@ -115,12 +119,21 @@ class Step:
         self.logs.append(log_entry)
         return log_entry
     
+    def get_log_count(self) -> int:
+        """Number of log entries, from the loaded logs or the stored summary"""
+        return len(self.logs) if self.logs else self.log_count
+    
+    def get_last_log_at(self) -> Optional[datetime]:
+        """Timestamp of the last log entry, from the loaded logs or the stored summary"""
+        return self.logs[-1].timestamp if self.logs else self.last_log_at
+    
     def get_logs_text(self) -> str:
         """Get all logs as plain text"""
         return '\n'.join(log.content for log in self.logs)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
+        last_log_at = self.get_last_log_at()
         return {
             'id': self.id,
             'execution_id': self.execution_id,
@@ -136,6 +149,8 @@ class Step:
             'estimated_duration': self.estimated_duration,
             'duration_seconds': self.duration_seconds,
             'logs': [log.to_dict() for log in self.logs],
+            'log_count': self.get_log_count(),
+            'last_log_at': last_log_at.isoformat() if last_log_at else None,
             'metadata': self.metadata,
             'is_finished': self.is_finished
         }
@@ -144,7 +159,7 @@ class Step:
     def from_dict(cls, data: Dict[str, Any]) -> 'Step':
         """Create from dictionary"""
         step = cls(
-            id=data.get('id', str(uuid.uuid4())),
+            id=data['id'] if 'id' in data else str(uuid.uuid4()),
             execution_id=data.get('execution_id', ''),
             name=data.get('name', ''),
             description=data.get('description', ''),
@@ -154,7 +169,8 @@ class Step:
             error_message=data.get('error_message'),
             estimated_duration=data.get('estimated_duration'),
             stop_on_error=data.get('stop_on_error', False),
-            metadata=data.get('metadata', {})
+            metadata=data.get('metadata', {}),
+            log_count=data.get('log_count') or 0
         )
         
         # Parse datetime fields
@@ -164,6 +180,8 @@ class Step:
             step.started_at = datetime.fromisoformat(data['started_at'])
         if data.get('completed_at'):
             step.completed_at = datetime.fromisoformat(data['completed_at'])
+        if data.get('last_log_at'):
+            step.last_log_at = datetime.fromisoformat(data['last_log_at'])
         
         # Parse logs
         if data.get('logs'):